@@ -0,0 +1,27 @@
+"""Precomputed move tables for square boards.
+
+move_table() lists, for every cell of a board, the cells one step UP, DOWN,
+LEFT and RIGHT of it (the order of the games' Direction enums), with None
+where a move would leave the board. The tables are built once per board size
+and cached, so generating a snake's moves is a table lookup instead of
+adding direction tuples and bounds checking the result, and a cell is on the
+board exactly when it is a key of the table.
+"""
+from functools import lru_cache
+
+STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0))  # UP, DOWN, LEFT, RIGHT
+
+
+@lru_cache(maxsize=None)
+def move_table(cells):
+    """(x, y) -> the four neighbouring positions, None off the board."""
+    return {(x, y): tuple((x + dx, y + dy) if 0 <= x + dx < cells and 0 <= y + dy < cells
+                          else None for dx, dy in STEPS)
+            for y in range(cells) for x in range(cells)}
+
+
+@lru_cache(maxsize=None)
+def open_neighbors(cells):
+    """(x, y) -> the neighbouring positions that are on the board."""
+    return {pos: tuple(n for n in moves if n is not None)
+            for pos, moves in move_table(cells).items()}
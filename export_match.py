@@ -0,0 +1,158 @@
+"""Headless match export.
+
+Renders matches with trial.Game's own drawing code onto an offscreen surface
+and streams the frames to a PNG sequence or an animated GIF. Each match runs
+in its own process, so a batch of matches exports far faster than real time.
+
+    python export_match.py 1 2 3 --format gif --out clips
+"""
+import headless  # sets SDL up for offscreen rendering, so before pygame
+
+import argparse
+import os
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+
+import pygame
+
+import replay_store
+import trial
+
+
+def apply_snapshot(game, snapshot):
+    """Load a recorded tick into a game so draw_game can render it."""
+    game.player_snake.body = [tuple(p) for p in snapshot["player"]]
+    game.ai_snake.body = [tuple(p) for p in snapshot["ai"]]
+    game.fruit_pos = tuple(snapshot["fruit"])
+    game.player_snake.score, game.ai_snake.score = snapshot["scores"]
+    game.elapsed_time = snapshot["tick"] / trial.TICK_RATE
+
+
+class PngSequenceWriter:
+    def __init__(self, path, fps):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.count = 0
+
+    def write(self, surface):
+        # pygame encodes straight from the surface, no array needed
+        pygame.image.save(surface, os.path.join(self.path, f"{self.count:06d}.png"))
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class GifWriter:
+    # Written against imageio 2.38's v3 API with its Pillow plugin, which
+    # takes the frame duration in milliseconds
+    def __init__(self, path, fps):
+        try:
+            import imageio.v3 as iio
+        except ImportError:
+            raise RuntimeError("GIF export needs imageio >= 2.38 and Pillow "
+                               "(pip install 'imageio>=2.38' pillow)")
+        self.writer = iio.imopen(path, "w", plugin="pillow")
+        self.duration = 1000 / fps
+
+    def write(self, surface):
+        # pixels3d is a view on the surface memory in (x, y) order, transpose
+        # is another view, so the encoder reads the pixels without a copy
+        frame = pygame.surfarray.pixels3d(surface)
+        self.writer.write(frame.transpose(1, 0, 2), duration=self.duration, loop=0)
+        # Release the surface lock before the next frame is drawn
+        del frame
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"png": PngSequenceWriter, "gif": GifWriter}
+
+
+def export_snapshots(snapshots, path, fmt="png", fps=trial.TICK_RATE, every=1):
+    """Render recorded snapshots with trial.Game.draw_game into `path`."""
+    surface = pygame.Surface((trial.WINDOW_WIDTH, trial.WINDOW_HEIGHT))
+    game = trial.Game(screen=surface)
+    writer = WRITERS[fmt](path, fps / every)
+    try:
+        for snapshot in islice(snapshots, 0, None, every):
+            apply_snapshot(game, snapshot)
+            game.draw_game()
+            writer.write(surface)
+    finally:
+        writer.close()
+    return path
+
+
+def export_stored_game(store_path, game_id, out_dir, fmt="png", every=1):
+    """Render a game from a replay_store.ReplayStore."""
+    rows = replay_store.ReplayStore(store_path).ticks(game_id)
+    name = f"game_{game_id}" + (".gif" if fmt == "gif" else "")
+    return export_snapshots(replay_store.snapshots(rows), os.path.join(out_dir, name),
+                            fmt, every=every)
+
+
+def export_match(seed, out_dir, fmt="png", ticks=trial.MATCH_TICKS,
+                 player_policy="heuristic", ai_policy="heuristic", every=1, ai_weights=None):
+    """Simulate and render a single match, returning the output path."""
+    rows = replay_store.record_match(seed, ticks, player_policy, ai_policy, ai_weights)
+    snapshots = replay_store.snapshots(rows)
+    name = f"match_{seed}" + (".gif" if fmt == "gif" else "")
+    return export_snapshots(snapshots, os.path.join(out_dir, name), fmt, every=every)
+
+
+def export_matches(seeds, out_dir, fmt="png", processes=None, **kwargs):
+    """Export many matches in parallel, one process per match."""
+    os.makedirs(out_dir, exist_ok=True)
+    task = partial(export_match, out_dir=out_dir, fmt=fmt, **kwargs)
+    pool = Pool(processes)
+    try:
+        return pool.map(task, seeds)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def export_stored_games(store_path, game_ids, out_dir, fmt="png", processes=None, every=1):
+    os.makedirs(out_dir, exist_ok=True)
+    task = partial(export_stored_game, store_path, out_dir=out_dir, fmt=fmt, every=every)
+    pool = Pool(processes)
+    try:
+        return pool.map(task, game_ids)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export AI matches to video frames")
+    parser.add_argument("seeds", type=int, nargs="+",
+                        help="match seeds to play, or game ids with --store")
+    parser.add_argument("--store", help="export recorded games from this replay store")
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="png")
+    parser.add_argument("--ticks", type=int, default=trial.MATCH_TICKS)
+    parser.add_argument("--every", type=int, default=1, help="keep every Nth frame")
+    parser.add_argument("--player-policy", default="heuristic")
+    parser.add_argument("--ai-policy", default="heuristic")
+    parser.add_argument("--ai-profile", help="AI weights from tune_ai.py, defaults otherwise")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+    ai_weights = trial.load_ai_profile(args.ai_profile, missing_ok=False) if args.ai_profile else None
+
+    if args.store:
+        paths = export_stored_games(args.store, args.seeds, args.out, args.format,
+                                    args.processes, args.every)
+    else:
+        paths = export_matches(args.seeds, args.out, args.format, args.processes,
+                               ticks=args.ticks, every=args.every,
+                               player_policy=args.player_policy,
+                               ai_policy=args.ai_policy, ai_weights=ai_weights)
+    for path in paths:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
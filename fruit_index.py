@@ -0,0 +1,82 @@
+"""Grid-bucket spatial index for boards with many fruits.
+
+Fruits are kept in square buckets of bucket_size x bucket_size cells, so
+adding or removing one is a couple of set operations. Nearest-fruit queries
+search rings of buckets outwards from the query cell and stop as soon as no
+unsearched bucket can hold anything closer, instead of scanning every fruit.
+Distances are Manhattan, like the rest of the AI code.
+"""
+import heapq
+
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class FruitIndex:
+    def __init__(self, cells, bucket_size=4):
+        self.bucket_size = bucket_size
+        self.max_ring = cells // bucket_size + 1  # rings needed to cover the board
+        self.buckets = {}  # (bucket_x, bucket_y) -> set of fruit positions
+        self.positions = set()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, pos):
+        return pos in self.positions
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def bucket(self, pos):
+        return pos[0] // self.bucket_size, pos[1] // self.bucket_size
+
+    def add(self, pos):
+        if pos not in self.positions:
+            self.positions.add(pos)
+            self.buckets.setdefault(self.bucket(pos), set()).add(pos)
+
+    def remove(self, pos):
+        self.positions.discard(pos)
+        key = self.bucket(pos)
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket.discard(pos)
+            if not bucket:
+                del self.buckets[key]
+
+    def ring(self, center, radius):
+        """Yield the fruits of all buckets exactly `radius` buckets away."""
+        cx, cy = center
+        if radius == 0:
+            keys = [center]
+        else:
+            keys = [(cx + d, cy + side) for d in range(-radius, radius + 1)
+                    for side in (-radius, radius)]
+            keys += [(cx + side, cy + d) for d in range(-radius + 1, radius)
+                     for side in (-radius, radius)]
+        for key in keys:
+            bucket = self.buckets.get(key)
+            if bucket:
+                yield from bucket
+
+    def k_nearest(self, pos, k):
+        """Return up to k fruits, closest first."""
+        if not self.positions or k <= 0:
+            return []
+        k = min(k, len(self.positions))
+        center = self.bucket(pos)
+        found = []
+        for radius in range(self.max_ring + 1):
+            found.extend((manhattan(pos, fruit), fruit) for fruit in self.ring(center, radius))
+            # Anything in a further ring is more than radius buckets away
+            # along x or y, so at least this far from pos
+            bound = radius * self.bucket_size
+            if len(found) >= k and heapq.nsmallest(k, found)[-1][0] <= bound:
+                break
+        return [fruit for _, fruit in heapq.nsmallest(k, found)]
+
+    def nearest(self, pos):
+        fruits = self.k_nearest(pos, 1)
+        return fruits[0] if fruits else None
@@ -0,0 +1,92 @@
+"""Hamiltonian-cycle solver shared by the snake games.
+
+The cycle visits every cell of a square board exactly once, so a snake that
+follows it can never trap itself and will eventually fill the board. To save
+ticks the solver jumps ahead along the cycle towards the fruit, but only when
+the jump lands strictly between the head and the tail in cycle order: the
+body always lies behind the head on the cycle, so those cells are free and
+stay free until the tail gets there.
+
+Only the snake's own body is covered by that guarantee. Cells held by another
+snake are avoided when possible but can still block the cycle.
+"""
+from functools import lru_cache
+
+import board
+
+# Cells of slack kept between the head and the tail when shortcutting
+SAFETY_MARGIN = 4
+
+
+@lru_cache(maxsize=None)
+def hamiltonian_cycle(cells):
+    """Return (order, index) for a cells x cells board.
+
+    order lists every cell in cycle order and index maps a cell back to its
+    position in order. Boards with an odd number of cells per side have no
+    Hamiltonian cycle and raise ValueError.
+    """
+    if cells < 2 or cells % 2:
+        raise ValueError(f"no Hamiltonian cycle on a {cells}x{cells} board")
+
+    # Run along the top row, zig-zag down through columns 1.., then come
+    # back up column 0 to the start
+    order = [(x, 0) for x in range(cells)]
+    for y in range(1, cells):
+        xs = range(cells - 1, 0, -1) if y % 2 else range(1, cells)
+        order.extend((x, y) for x in xs)
+    order.extend((0, y) for y in range(cells - 1, 0, -1))
+
+    index = {pos: i for i, pos in enumerate(order)}
+    return tuple(order), index
+
+
+def neighbours(pos, cells):
+    return board.open_neighbors(cells)[pos]
+
+
+def next_cell(body, fruit_pos, cells, blocked=()):
+    """Pick the cell the head of `body` should move into next.
+
+    blocked holds cells taken by other snakes. The plain cycle step is
+    returned when no free cell is available at all.
+    """
+    order, index = hamiltonian_cycle(cells)
+    size = len(order)
+    head = body[0]
+    head_index = index[head]
+
+    def ahead(pos):
+        # Distance from the head to pos, following the cycle
+        return (index[pos] - head_index) % size
+
+    tail_gap = ahead(body[-1]) if len(body) > 1 else size
+    fruit_gap = ahead(fruit_pos) if fruit_pos in index else size
+    cycle_step = order[(head_index + 1) % size]
+
+    # Once the snake covers half the board shortcuts save little and the
+    # margin gets tight, so just follow the cycle
+    shortcuts = len(body) < size // 2
+    best, best_gap = None, 0
+    for pos in neighbours(head, cells):
+        if pos in blocked:
+            continue
+        gap = ahead(pos)
+        # The cycle step (gap 1) is always safe, anything further is a
+        # shortcut that must not overshoot the fruit or close in on the tail
+        if gap != 1 and (not shortcuts or gap > fruit_gap or
+                         gap >= tail_gap - SAFETY_MARGIN):
+            continue
+        if gap > best_gap:
+            best, best_gap = pos, gap
+
+    if best is not None:
+        return best
+
+    # The cycle step is taken by another snake, dodge into the nearest free
+    # cell that is still ahead of our own tail
+    free = [pos for pos in neighbours(head, cells)
+            if pos not in blocked and 0 < ahead(pos) < tail_gap]
+    if free:
+        return min(free, key=ahead)
+    return cycle_step
@@ -0,0 +1,39 @@
+"""Headless trial.py matches for the offline tools.
+
+Import this before pygame or trial: it sets SDL up to run without a window
+or sound card, and without the signal handlers that would keep pool workers
+from being stopped. headless_game() and play() then give seeded matches that
+replay the same every time.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Otherwise SDL turns SIGTERM into a QUIT event and workers can't be stopped
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+import random
+
+import pygame
+
+import trial
+
+
+def headless_game(seed=None, **options):
+    """A trial.Game that never draws, seeded with `seed` unless it is None.
+
+    `options` are passed on to trial.Game (policies, weights, fruit count).
+    """
+    if seed is not None:
+        random.seed(seed)
+    # A 1x1 surface is enough, nothing is ever drawn with pygame
+    return trial.Game(screen=pygame.Surface((1, 1)), **options)
+
+
+def play(seed, ticks=trial.MATCH_TICKS, **options):
+    """Play a seeded match, yielding the game at the start and after every tick."""
+    game = headless_game(seed, **options)
+    yield game
+    for _ in range(ticks):
+        game.step()
+        yield game
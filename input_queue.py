@@ -0,0 +1,147 @@
+"""Tick-synchronised player input.
+
+Key presses, swipes and network moves are queued with the time they arrived
+and applied one per simulation tick. Two quick presses inside one tick are
+no longer lost, and a turn is only rejected when it reverses the direction
+the snake will really be heading in once the earlier queued turns apply.
+
+The queue also measures input latency: the time from an input arriving to
+the first displayed frame that shows the move it caused. For that, inputs
+have to be pushed the moment they arrive, so frontends wait for their next
+tick with wait_until() or TickPacer, which hand over input while waiting
+instead of sleeping through it.
+"""
+import time
+from collections import deque
+
+import pygame
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: "UP",
+    pygame.K_DOWN: "DOWN",
+    pygame.K_LEFT: "LEFT",
+    pygame.K_RIGHT: "RIGHT",
+}
+
+
+def swipe_direction(dx, dy, min_distance):
+    """Map a swipe vector to a direction name, or None if it is too short."""
+    if abs(dx) <= min_distance and abs(dy) <= min_distance:
+        return None
+    if abs(dx) > abs(dy):
+        return "RIGHT" if dx > 0 else "LEFT"
+    return "DOWN" if dy > 0 else "UP"
+
+
+def wait_event(timeout_ms):
+    """Wait up to timeout_ms for a pygame event, None if none came."""
+    event = pygame.event.wait(timeout_ms)
+    return None if event.type == pygame.NOEVENT else event
+
+
+def wait_until(deadline, read_input, handle_input):
+    """Wait until the perf_counter() time `deadline`, handling input on arrival.
+
+    read_input(timeout_ms) blocks for at most timeout_ms and returns one
+    input or None, handle_input(input) returns False to quit. Returns False
+    as soon as an input quits, True once the deadline is reached.
+    """
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return True
+        item = read_input(max(1, int(remaining * 1000)))
+        if item is not None and not handle_input(item):
+            return False
+
+
+class TickPacer:
+    """Evenly spaced ticks, waited for with wait_until()."""
+
+    def __init__(self, rate):
+        self.tick_length = 1 / rate
+        self.last_tick = None  # perf_counter() of the last tick
+
+    def reset(self):
+        self.last_tick = None
+
+    def wait(self, read_input, handle_input):
+        """Wait for the next tick, returning False if an input quit."""
+        now = time.perf_counter()
+        if self.last_tick is None or now - self.last_tick > 2 * self.tick_length:
+            # First tick, or fell behind: don't try to catch up with a burst
+            self.last_tick = now
+        self.last_tick += self.tick_length
+        return wait_until(self.last_tick, read_input, handle_input)
+
+
+def is_reverse(direction, other):
+    return (direction.value[0] == -other.value[0] and
+            direction.value[1] == -other.value[1])
+
+
+class InputQueue:
+    def __init__(self, maxlen=3, latency_samples=500):
+        self.maxlen = maxlen
+        self.pending = deque()  # (direction, source, timestamp)
+        self.applied = []  # timestamps of applied inputs not yet on screen
+        self.latencies = deque(maxlen=latency_samples)  # seconds
+
+    def clear(self):
+        self.pending.clear()
+        self.applied.clear()
+
+    def push(self, direction, current_direction, source="key", timestamp=None):
+        """Queue a turn, checked against the direction it will follow.
+
+        timestamp must come from time.perf_counter() and defaults to now, so
+        push inputs as they arrive rather than when the next tick reads them,
+        or the time they waited goes unmeasured. Network inputs can pass their
+        (clock-corrected) send time to include transport delay.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        previous = self.pending[-1][0] if self.pending else current_direction
+        if direction == previous or is_reverse(direction, previous):
+            return False
+        if len(self.pending) >= self.maxlen:
+            # Drop mashed keys rather than run minutes behind the player
+            return False
+        self.pending.append((direction, source, timestamp))
+        return True
+
+    def apply(self, snake):
+        """Apply at most one queued turn to the snake, once per tick."""
+        while self.pending:
+            direction, source, timestamp = self.pending.popleft()
+            # A wall bounce may have changed direction since it was queued
+            if direction != snake.direction and not is_reverse(direction, snake.direction):
+                snake.direction = direction
+                self.applied.append(timestamp)
+                return True
+        return False
+
+    def presented(self):
+        """Call right after the frame is flipped to record latency."""
+        if self.applied:
+            now = time.perf_counter()
+            self.latencies.extend(now - t for t in self.applied)
+            self.applied.clear()
+
+    def latency_report(self):
+        """Return average, 95th percentile and worst latency in milliseconds."""
+        if not self.latencies:
+            return None
+        samples = sorted(self.latencies)
+        return {
+            "count": len(samples),
+            "avg_ms": 1000 * sum(samples) / len(samples),
+            "p95_ms": 1000 * samples[int(0.95 * (len(samples) - 1))],
+            "max_ms": 1000 * samples[-1],
+        }
+
+    def latency_text(self):
+        report = self.latency_report()
+        if report is None:
+            return "Input latency: -"
+        return "Input latency: avg {avg_ms:.0f}ms  p95 {p95_ms:.0f}ms  max {max_ms:.0f}ms".format(**report)
@@ -0,0 +1,147 @@
+"""Reachable-space analysis for the snake AIs.
+
+ReachableArea keeps the free cells of a board grouped into connected regions
+and updates them incrementally as snakes move. A freed cell merges the
+regions around it (smaller into larger). An occupied cell can only split its
+region if the free cells around it are not already connected through their
+own neighbourhood, so most ticks need no flood fill at all. When a split is
+possible only that region is re-filled, and only when it is next queried.
+
+is_trap() uses the regions to tell whether a move leads into a pocket
+smaller than the snake, taking into account tail segments that will have
+moved away by the time the snake gets to them.
+"""
+from itertools import count
+
+import board
+
+# Clockwise around a cell, starting north; even indices are the edge
+# neighbours, odd ones the corners between them
+RING = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+
+class ReachableArea:
+    def __init__(self, cells):
+        self.cells = cells
+        self.blocked = set()
+        self.adjacent = board.open_neighbors(cells)
+        everything = set(self.adjacent)
+        self.ids = count(1)
+        self.regions = {0: everything}  # region id -> set of free cells
+        self.label = dict.fromkeys(everything, 0)  # free cell -> region id
+        self.dirty = set()  # regions that may have been split
+
+    def on_board(self, pos):
+        return pos in self.adjacent
+
+    def is_free(self, pos):
+        return self.on_board(pos) and pos not in self.blocked
+
+    def neighbours(self, pos):
+        return self.adjacent.get(pos, ())
+
+    def update(self, bodies):
+        """Bring the regions in line with the given snake bodies."""
+        occupied = {pos for body in bodies for pos in body if self.on_board(pos)}
+        for pos in self.blocked - occupied:
+            self.free(pos)
+        for pos in occupied - self.blocked:
+            self.occupy(pos)
+
+    def occupy(self, pos):
+        if not self.is_free(pos):
+            return
+        self.blocked.add(pos)
+        region_id = self.label.pop(pos)
+        region = self.regions[region_id]
+        region.discard(pos)
+        if not region:
+            del self.regions[region_id]
+        elif not self.locally_connected(pos):
+            self.dirty.add(region_id)
+
+    def locally_connected(self, pos):
+        # Walk the 8 cells around pos: its free edge neighbours are surely
+        # still connected if consecutive ones are linked by a free corner
+        x, y = pos
+        free = [self.is_free((x + dx, y + dy)) for dx, dy in RING]
+        edges = sum(free[0::2])
+        links = sum(free[i] and free[i + 1] and free[(i + 2) % 8] for i in range(0, 8, 2))
+        return edges - links <= 1
+
+    def free(self, pos):
+        if pos not in self.blocked:
+            return
+        self.blocked.discard(pos)
+        around = {self.label[n] for n in self.neighbours(pos) if n in self.label}
+        if not around:
+            region_id = next(self.ids)
+            self.regions[region_id] = set()
+        else:
+            # Merge smaller regions into the largest one
+            region_id = max(around, key=lambda r: len(self.regions[r]))
+            target = self.regions[region_id]
+            for other in around - {region_id}:
+                cells = self.regions.pop(other)
+                for cell in cells:
+                    self.label[cell] = region_id
+                target |= cells
+                if other in self.dirty:
+                    self.dirty.discard(other)
+                    self.dirty.add(region_id)
+        self.regions[region_id].add(pos)
+        self.label[pos] = region_id
+
+    def split(self, region_id):
+        # Flood fill just this region; the largest part keeps the id so
+        # only the smaller parts need relabelling
+        unvisited = self.regions.pop(region_id, set())
+        parts = []
+        while unvisited:
+            start = unvisited.pop()
+            part = {start}
+            stack = [start]
+            while stack:
+                for n in self.neighbours(stack.pop()):
+                    if n in unvisited:
+                        unvisited.discard(n)
+                        part.add(n)
+                        stack.append(n)
+            parts.append(part)
+
+        parts.sort(key=len, reverse=True)
+        for i, part in enumerate(parts):
+            part_id = region_id if i == 0 else next(self.ids)
+            self.regions[part_id] = part
+            if i:
+                for cell in part:
+                    self.label[cell] = part_id
+
+    def region(self, pos):
+        """Return the set of free cells connected to pos (empty if blocked)."""
+        while self.dirty:
+            self.split(self.dirty.pop())
+        region_id = self.label.get(pos)
+        return self.regions[region_id] if region_id is not None else set()
+
+    def region_size(self, pos):
+        return len(self.region(pos))
+
+    def is_trap(self, pos, length, bodies):
+        """True if moving to pos leaves less room than `length` cells.
+
+        A region is still escapable if it touches a body segment that will
+        have moved off before the snake runs out of room: the segment k
+        cells from a tail is gone after k + 1 ticks.
+        """
+        region = self.region(pos)
+        size = len(region)
+        if size >= length:
+            return False
+        for body in bodies:
+            for ticks, segment in enumerate(reversed(body), 1):
+                if ticks > size:
+                    break
+                if any(n in region for n in self.neighbours(segment)):
+                    return False
+        return True
@@ -0,0 +1,65 @@
+"""Frame-time driven render quality for trial_trial.py.
+
+Phones differ wildly in how long a frame takes, and so does a single game as
+the snakes grow. QualityGovernor averages the time spent building each frame
+over a short window and compares it to the frame budget: over budget it
+drops one level of detail, well under budget it brings one back. Each window
+starts fresh after a change, so a level gets a full window before it is
+judged, which keeps the level from flickering between two settings.
+
+Detail is dropped in this order: eye pupils, then eyes, then grid lines.
+"""
+import time
+from collections import deque
+
+# Lowest level that still draws each detail
+GRID, EYES, PUPILS = 1, 2, 3
+LEVEL_NAMES = ("minimal", "no eyes", "no pupils", "full")
+
+
+class QualityGovernor:
+    def __init__(self, budget_ms, window=30, headroom=0.5):
+        self.budget_ms = budget_ms
+        self.headroom = headroom  # step up below this fraction of the budget
+        self.level = len(LEVEL_NAMES) - 1
+        self.frame_times = deque(maxlen=window)
+        self.last_average = 0.0  # of the previous full window, for the HUD
+        self.frame_start = None
+
+    def reset(self):
+        """Start a fresh window, keeping the level, e.g. when a game starts."""
+        self.frame_times.clear()
+        self.frame_start = None
+
+    def start_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        self.record((time.perf_counter() - self.frame_start) * 1000)
+        self.frame_start = None
+
+    def record(self, frame_ms):
+        self.frame_times.append(frame_ms)
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return
+        average = self.last_average = self.average()
+        if average > self.budget_ms and self.level > 0:
+            self.level -= 1
+        elif average < self.budget_ms * self.headroom and self.level < len(LEVEL_NAMES) - 1:
+            self.level += 1
+        else:
+            return
+        self.frame_times.clear()
+
+    def average(self):
+        return sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0.0
+
+    def draws(self, detail):
+        """True if the current level still draws the given detail."""
+        return self.level >= detail
+
+    def text(self):
+        return (f"Quality: {LEVEL_NAMES[self.level]}  "
+                f"frame {self.last_average:.1f}/{self.budget_ms:.0f}ms")
@@ -0,0 +1,266 @@
+"""Append-only, memory-mapped store of recorded matches.
+
+A store is a directory holding two flat files of fixed-size numpy records:
+
+    ticks.bin  one TICK_DTYPE row per tick of every game, games back to back
+    index.bin  one INDEX_DTYPE summary row per game, pointing into ticks.bin
+
+Both are read through np.memmap, so filtering the index is a vectorised
+numpy expression and fetching a game's ticks is a slice of the mapped file,
+with nothing loaded until it is touched. Games are only ever appended; the
+index row is written last, so a crash mid-append leaves at most some
+unreferenced ticks and part of an index row, which the next append
+overwrites.
+
+    store = ReplayStore("replays")
+    index = store.index
+    lost = store.where(index["winner"] == WINNER_AI)
+    gap = store.where(abs(index["player_score"].astype(int) - index["ai_score"]) > 10)
+    longest = index["max_length"].argmax()
+
+Each game also stores a version of the weights its heuristic snakes played,
+a hash of the weights dict, so games from different tuned profiles can be
+told apart even though both are "heuristic".
+"""
+import headless  # recording plays headless matches, so before pygame
+
+import argparse
+import hashlib
+import json
+import os
+from functools import partial
+from multiprocessing import Pool
+
+import numpy as np
+
+import trial
+
+TICK_DTYPE = np.dtype([
+    ("player_head", "i2", 2),
+    ("player_length", "u2"),
+    ("ai_head", "i2", 2),
+    ("ai_length", "u2"),
+    ("fruit", "i2", 2),
+    ("player_score", "u2"),
+    ("ai_score", "u2"),
+])
+
+INDEX_DTYPE = np.dtype([
+    ("offset", "u8"),  # first row in ticks.bin
+    ("ticks", "u4"),
+    ("seed", "u8"),
+    ("winner", "i1"),
+    ("player_score", "u4"),
+    ("ai_score", "u4"),
+    ("max_length", "u2"),  # longest either snake got
+    ("player_policy", "S16"),
+    ("ai_policy", "S16"),
+    ("player_version", "S16"),  # policy_version() of each snake
+    ("ai_version", "S16"),
+])
+
+WINNER_TIE = -1
+WINNER_PLAYER = 0
+WINNER_AI = 1
+
+
+def policy_version(policy, weights=None):
+    """Short hash of the weights a heuristic snake plays, empty for other policies."""
+    if policy != "heuristic":
+        return ""
+    weights = dict(trial.AI_WEIGHTS, **(weights or {}))
+    return hashlib.sha1(json.dumps(weights, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def tick_row(game):
+    """Pack the state of a trial.Game into one TICK_DTYPE row."""
+    return (game.player_snake.body[0], len(game.player_snake.body),
+            game.ai_snake.body[0], len(game.ai_snake.body),
+            game.fruit_pos, game.player_snake.score, game.ai_snake.score)
+
+
+def record_match(seed, ticks=trial.MATCH_TICKS, player_policy="heuristic",
+                 ai_policy="heuristic", ai_weights=None):
+    """Play a headless match, returning its rows with the start state first."""
+    rows = np.zeros(ticks + 1, TICK_DTYPE)
+    for tick, game in enumerate(headless.play(seed, ticks, player_policy=player_policy,
+                                              ai_policy=ai_policy, ai_weights=ai_weights)):
+        rows[tick] = tick_row(game)
+    return rows
+
+
+def snapshots(rows):
+    """Rebuild full snake bodies from tick rows, for export_match.
+
+    A body is always the most recent heads, newest first, so it can be
+    recovered from the head history and the length.
+    """
+    player_heads, ai_heads = [], []
+    for tick, row in enumerate(rows):
+        player_heads.append(tuple(int(v) for v in row["player_head"]))
+        ai_heads.append(tuple(int(v) for v in row["ai_head"]))
+        yield {
+            "tick": tick,
+            "player": player_heads[:-int(row["player_length"]) - 1:-1],
+            "ai": ai_heads[:-int(row["ai_length"]) - 1:-1],
+            "fruit": tuple(int(v) for v in row["fruit"]),
+            "scores": (int(row["player_score"]), int(row["ai_score"])),
+        }
+
+
+def _mapped(path, dtype):
+    count = os.path.getsize(path) // dtype.itemsize
+    if count == 0:
+        # mmap can't map an empty file
+        return np.zeros(0, dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+class ReplayStore:
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.ticks_path = os.path.join(path, "ticks.bin")
+        self.index_path = os.path.join(path, "index.bin")
+        for file_path in (self.ticks_path, self.index_path):
+            if not os.path.exists(file_path):
+                open(file_path, "wb").close()
+        self._index = None
+        self._ticks = None
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def index(self):
+        """Memory-mapped summary rows, one per game, in append order."""
+        if self._index is None:
+            self._index = _mapped(self.index_path, INDEX_DTYPE)
+        return self._index
+
+    def ticks(self, game_id):
+        """Return a game's tick rows as a view into the mapped file."""
+        if self._ticks is None:
+            self._ticks = _mapped(self.ticks_path, TICK_DTYPE)
+        entry = self.index[game_id]
+        start = int(entry["offset"])
+        return self._ticks[start:start + int(entry["ticks"])]
+
+    def where(self, mask):
+        """Turn a boolean mask over the index into game ids."""
+        return np.flatnonzero(mask)
+
+    def append(self, rows, seed, player_policy, ai_policy, ai_weights=None):
+        """Store one recorded game and return its id.
+
+        ai_weights are the weights the AI snake played with, None for the
+        defaults; the player snake always plays the defaults.
+        """
+        rows = np.asarray(rows, TICK_DTYPE)
+        index = self.index
+        offset = int(index[-1]["offset"] + index[-1]["ticks"]) if len(index) else 0
+
+        final = rows[-1]
+        player_score, ai_score = int(final["player_score"]), int(final["ai_score"])
+        if player_score > ai_score:
+            winner = WINNER_PLAYER
+        elif ai_score > player_score:
+            winner = WINNER_AI
+        else:
+            winner = WINNER_TIE
+        entry = np.array([(offset, len(rows), seed, winner, player_score, ai_score,
+                           max(rows["player_length"].max(), rows["ai_length"].max()),
+                           player_policy.encode(), ai_policy.encode(),
+                           policy_version(player_policy).encode(),
+                           policy_version(ai_policy, ai_weights).encode())], INDEX_DTYPE)
+
+        # Write ticks where the index says they end, dropping any leftovers
+        # from an append that crashed before its index row was written
+        with open(self.ticks_path, "r+b") as f:
+            f.seek(offset * TICK_DTYPE.itemsize)
+            f.write(rows.tobytes())
+            f.truncate()
+        # Same for the index: a partly written row is not counted by
+        # len(index), so overwrite it rather than append after it
+        with open(self.index_path, "r+b") as f:
+            f.seek(len(index) * INDEX_DTYPE.itemsize)
+            f.write(entry.tobytes())
+            f.truncate()
+
+        # Remap on next access so the new game is visible
+        self._index = None
+        self._ticks = None
+        return len(index)
+
+
+def record_matches(path, seeds, processes=None, **kwargs):
+    """Play matches across a process pool and append them to a store."""
+    store = ReplayStore(path)
+    task = partial(record_match, **kwargs)
+    player_policy = kwargs.get("player_policy", "heuristic")
+    ai_policy = kwargs.get("ai_policy", "heuristic")
+    ai_weights = kwargs.get("ai_weights")
+    pool = Pool(processes)
+    try:
+        # Only this process writes, so appends never interleave
+        for seed, rows in zip(seeds, pool.imap(task, seeds, chunksize=8)):
+            store.append(rows, seed, player_policy, ai_policy, ai_weights)
+    finally:
+        pool.close()
+        pool.join()
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and query stored matches")
+    parser.add_argument("path", help="store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="play and store matches")
+    record.add_argument("--games", type=int, default=100)
+    record.add_argument("--first-seed", type=int, default=0)
+    record.add_argument("--ticks", type=int, default=trial.MATCH_TICKS)
+    record.add_argument("--player-policy", default="heuristic")
+    record.add_argument("--ai-policy", default="heuristic")
+    record.add_argument("--ai-profile", help="AI weights from tune_ai.py, defaults otherwise")
+    record.add_argument("--processes", type=int, default=None)
+
+    query = commands.add_parser("query", help="list matching games")
+    query.add_argument("--winner", choices=("player", "ai", "tie"))
+    query.add_argument("--min-gap", type=int, default=0, help="minimum score gap")
+    query.add_argument("--ai-version", help="only games whose AI played these weights")
+    query.add_argument("--longest", action="store_true",
+                       help="only show the game with the longest snake")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        seeds = range(args.first_seed, args.first_seed + args.games)
+        ai_weights = trial.load_ai_profile(args.ai_profile, missing_ok=False) if args.ai_profile else None
+        store = record_matches(args.path, seeds, args.processes, ticks=args.ticks,
+                               player_policy=args.player_policy, ai_policy=args.ai_policy,
+                               ai_weights=ai_weights)
+        print(f"{len(store)} games in {args.path}")
+        return
+
+    store = ReplayStore(args.path)
+    index = store.index
+    mask = np.ones(len(index), bool)
+    if args.winner:
+        winners = {"player": WINNER_PLAYER, "ai": WINNER_AI, "tie": WINNER_TIE}
+        mask &= index["winner"] == winners[args.winner]
+    if args.min_gap:
+        mask &= abs(index["player_score"].astype(np.int64) - index["ai_score"]) >= args.min_gap
+    if args.ai_version:
+        mask &= index["ai_version"] == args.ai_version.encode()
+    ids = store.where(mask)
+    if args.longest and len(ids):
+        ids = ids[[index["max_length"][ids].argmax()]]
+    for game_id in ids:
+        entry = index[game_id]
+        print(f"{game_id}: seed {entry['seed']}  player {entry['player_score']}"
+              f"  ai {entry['ai_score']}  max length {entry['max_length']}"
+              f"  ticks {entry['ticks']}"
+              f"  ai version {entry['ai_version'].decode() or '-'}")
+
+
+if __name__ == "__main__":
+    main()
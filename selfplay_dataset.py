@@ -0,0 +1,210 @@
+"""Streaming self-play dataset for imitation learning.
+
+Worker processes play headless trial.py matches with the heuristic AI
+(trial.Snake.ai_move) as the AI snake against a chosen opponent policy and
+stream (observation, action, reward) transitions of the AI snake back in
+chunks. A single writer packs them into fixed-size compressed shards:
+
+    shard-000000.npz  obs (n, GRID_CELLS, GRID_CELLS) uint8 board codes the
+                      AI snake decided on, after the player snake moved,
+                      action (n,) int8 index into trial.Direction,
+                      reward (n,) float32 score change of that tick
+    manifest.jsonl    one line per shard: file, size and the
+                      (seed, start_tick, end_tick) segments it holds
+
+The queue between workers and writer is bounded, so workers block when the
+writer falls behind and memory stays flat however many matches are played.
+Shards are written to a temporary file and renamed, and only count once
+their manifest line is written. On restart the manifest says which ticks of
+which seeds are stored; matches are replayed from their seed and only the
+missing ticks are sent, so nothing is duplicated.
+
+    python selfplay_dataset.py dataset --games 10000 --opponent hamiltonian
+"""
+import headless  # workers play headless matches, so before pygame
+
+import argparse
+import json
+import os
+import queue
+from itertools import islice
+from multiprocessing import Process, Queue
+
+import numpy as np
+
+import trial
+
+SHARD_SIZE = 65536  # transitions per shard, about 60 MB of observations uncompressed
+CHUNK_SIZE = 256  # transitions per queue message
+QUEUE_SIZE = 64  # chunks in flight before workers block
+
+EMPTY, FRUIT, OWN, OWN_HEAD, OTHER, OTHER_HEAD = range(6)
+DIRECTIONS = list(trial.Direction)
+
+
+def observe(game):
+    """Encode the board as seen by the AI snake, indexed [x, y]."""
+    board = np.zeros((trial.GRID_CELLS, trial.GRID_CELLS), np.uint8)
+    board[game.fruit_pos] = FRUIT
+    for snake, body_code, head_code in ((game.player_snake, OTHER, OTHER_HEAD),
+                                        (game.ai_snake, OWN, OWN_HEAD)):
+        for i, (x, y) in enumerate(snake.body):
+            board[x, y] = head_code if i == 0 else body_code
+    return board
+
+
+def transitions(seed, ticks=trial.MATCH_TICKS, opponent="heuristic"):
+    """Play a seeded match, yielding (obs, action, reward) for every tick."""
+    game = headless.headless_game(seed, player_policy=opponent)
+    for _ in range(ticks):
+        # Observe the board the AI decides on: after the player snake's move
+        game.step_player()
+        obs = observe(game)
+        score = game.ai_snake.score
+        game.step_ai()
+        game.check_collisions()
+        yield obs, DIRECTIONS.index(game.ai_snake.direction), game.ai_snake.score - score
+
+
+def produce(tasks, ticks, opponent, out):
+    """Worker loop: send (seed, start_tick, obs, actions, rewards) chunks."""
+    for seed, skip in tasks:
+        stream = islice(transitions(seed, ticks, opponent), skip, None)
+        start = skip
+        while True:
+            chunk = list(islice(stream, CHUNK_SIZE))
+            if not chunk:
+                break
+            obs, actions, rewards = zip(*chunk)
+            out.put((seed, start, np.stack(obs), np.array(actions, np.int8),
+                     np.array(rewards, np.float32)))
+            start += len(chunk)
+    out.put(None)
+
+
+class ShardWriter:
+    def __init__(self, path, shard_size=SHARD_SIZE):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.shard_size = shard_size
+        self.manifest_path = os.path.join(path, "manifest.jsonl")
+        self.written = {}  # seed -> ticks stored, always from tick 0
+        self.shards = 0
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.shards += 1
+                    for seed, _, end in entry["segments"]:
+                        self.written[seed] = max(self.written.get(seed, 0), end)
+
+        cells = trial.GRID_CELLS
+        self.obs = np.zeros((shard_size, cells, cells), np.uint8)
+        self.actions = np.zeros(shard_size, np.int8)
+        self.rewards = np.zeros(shard_size, np.float32)
+        self.size = 0
+        self.segments = []
+
+    def add(self, seed, start, obs, actions, rewards):
+        # A chunk can straddle shards, split it across them
+        while len(obs):
+            n = min(len(obs), self.shard_size - self.size)
+            self.obs[self.size:self.size + n] = obs[:n]
+            self.actions[self.size:self.size + n] = actions[:n]
+            self.rewards[self.size:self.size + n] = rewards[:n]
+            if self.segments and self.segments[-1][0] == seed and self.segments[-1][2] == start:
+                self.segments[-1][2] += n
+            else:
+                self.segments.append([seed, start, start + n])
+            self.size += n
+            start += n
+            obs, actions, rewards = obs[n:], actions[n:], rewards[n:]
+            if self.size == self.shard_size:
+                self.flush()
+
+    def flush(self):
+        if not self.size:
+            return
+        name = f"shard-{self.shards:06d}.npz"
+        tmp_path = os.path.join(self.path, name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, obs=self.obs[:self.size], action=self.actions[:self.size],
+                                reward=self.rewards[:self.size])
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+        # The shard only counts once it is in the manifest; a crash before
+        # this line means it gets written again under the same name
+        with open(self.manifest_path, "a") as f:
+            f.write(json.dumps({"file": name, "size": self.size,
+                                "segments": self.segments}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for seed, _, end in self.segments:
+            self.written[seed] = max(self.written.get(seed, 0), end)
+        self.shards += 1
+        self.size = 0
+        self.segments = []
+
+
+def generate(path, seeds, ticks=trial.MATCH_TICKS, opponent="heuristic", processes=None,
+             shard_size=SHARD_SIZE, queue_size=QUEUE_SIZE):
+    writer = ShardWriter(path, shard_size)
+    tasks = [(seed, writer.written.get(seed, 0)) for seed in seeds]
+    tasks = [(seed, skip) for seed, skip in tasks if skip < ticks]
+    if not tasks:
+        return writer
+    processes = min(processes or os.cpu_count(), len(tasks))
+
+    chunks = Queue(queue_size)
+    workers = [Process(target=produce, args=(tasks[i::processes], ticks, opponent, chunks))
+               for i in range(processes)]
+    for worker in workers:
+        worker.start()
+
+    running = processes
+    try:
+        while running:
+            try:
+                chunk = chunks.get(timeout=1)
+            except queue.Empty:
+                if any(worker.exitcode not in (None, 0) for worker in workers):
+                    raise RuntimeError("a self-play worker died")
+                continue
+            if chunk is None:
+                running -= 1
+            else:
+                writer.add(*chunk)
+        writer.flush()
+    except BaseException:
+        # The others may be blocked on a full queue that nobody reads any more
+        for worker in workers:
+            worker.kill()
+        raise
+    finally:
+        for worker in workers:
+            worker.join()
+    return writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a self-play transition dataset")
+    parser.add_argument("path", help="dataset directory")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--ticks", type=int, default=trial.MATCH_TICKS)
+    parser.add_argument("--opponent", default="heuristic", choices=("heuristic", "hamiltonian"),
+                        help="policy of the player snake")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="chunks buffered between workers and writer")
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    writer = generate(args.path, seeds, args.ticks, args.opponent, args.processes,
+                      args.shard_size, args.queue_size)
+    print(f"{writer.shards} shards in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Terminal frontend for the snake battle in trial.py.
+
+Plays or watches a match inside a terminal with curses, driven by the same
+trial.Game rules, so matches can be followed over SSH on machines without a
+display. Only cells that changed since the previous tick are redrawn, which
+keeps the output down to a few bytes per tick.
+
+    python snake_curses.py                          # play with the arrow keys
+    python snake_curses.py --watch --ai hamiltonian # AI vs AI
+"""
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# The game rules live in trial.py, which sets up pygame on import, so
+# keep it off the display and sound card first
+import headless
+
+import argparse
+import curses
+
+import trial
+from input_queue import TickPacer
+from trial import Direction
+
+CURSES_KEYS = {
+    curses.KEY_UP: "UP",
+    curses.KEY_DOWN: "DOWN",
+    curses.KEY_LEFT: "LEFT",
+    curses.KEY_RIGHT: "RIGHT",
+}
+
+EMPTY, FRUIT, PLAYER, AI = range(4)
+# Two characters per cell keep the board roughly square in a terminal
+GLYPHS = {EMPTY: "  ", FRUIT: "<>", PLAYER: "[]", AI: "()"}
+COLORS = {FRUIT: curses.COLOR_MAGENTA, PLAYER: curses.COLOR_RED, AI: curses.COLOR_BLUE}
+
+
+class TerminalGame:
+    def __init__(self, stdscr, player_policy="human", ai_policy="heuristic", fruit_count=1,
+                 ai_weights=None):
+        self.stdscr = stdscr
+        self.game = headless.headless_game(player_policy=player_policy, ai_policy=ai_policy,
+                                           fruit_count=fruit_count, ai_weights=ai_weights)
+        self.game.game_state = "PLAYING"
+        self.ticks = 0
+        self.cells = {}  # what the terminal currently shows, pos -> kind
+        self.hud = None
+
+        rows, cols = stdscr.getmaxyx()
+        if rows < trial.GRID_CELLS + 3 or cols < trial.GRID_CELLS * 2 + 2:
+            raise SystemExit(f"Terminal must be at least {trial.GRID_CELLS * 2 + 2}x"
+                             f"{trial.GRID_CELLS + 3} to show the board")
+
+        curses.curs_set(0)
+        stdscr.nodelay(True)
+        stdscr.keypad(True)
+        self.attrs = {EMPTY: curses.A_NORMAL}
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            for kind, color in COLORS.items():
+                curses.init_pair(kind, curses.COLOR_WHITE, color)
+                self.attrs[kind] = curses.color_pair(kind) | curses.A_BOLD
+        else:
+            for kind in COLORS:
+                self.attrs[kind] = curses.A_BOLD
+
+        self.board = curses.newwin(trial.GRID_CELLS + 2, trial.GRID_CELLS * 2 + 2, 1, 0)
+        self.board.box()
+
+    def board_state(self):
+        state = {fruit: FRUIT for fruit in self.game.all_fruits()}
+        for pos in self.game.ai_snake.body:
+            state[pos] = AI
+        for pos in self.game.player_snake.body:
+            state[pos] = PLAYER
+        return state
+
+    def draw_cell(self, pos, kind):
+        x, y = pos
+        self.board.addstr(y + 1, x * 2 + 1, GLYPHS[kind], self.attrs[kind])
+
+    def draw(self):
+        state = self.board_state()
+        for pos in self.cells.keys() - state.keys():
+            self.draw_cell(pos, EMPTY)
+        for pos, kind in state.items():
+            if self.cells.get(pos) != kind:
+                self.draw_cell(pos, kind)
+        self.cells = state
+
+        time_left = max(0, trial.GAME_DURATION - self.game.elapsed_time)
+        hud = (f"Player: {self.game.player_snake.score}  AI: {self.game.ai_snake.score}"
+               f"  Time: {int(time_left)}s  (q quits)")
+        if hud != self.hud:
+            self.stdscr.addstr(0, 0, hud)
+            self.stdscr.clrtoeol()
+            self.hud = hud
+
+        # curses only sends what differs from the terminal's current contents
+        self.stdscr.noutrefresh()
+        self.board.noutrefresh()
+        curses.doupdate()
+
+    def handle_key(self, key):
+        if key in (ord("q"), ord("Q")):
+            return False
+        if key in CURSES_KEYS:
+            self.game.inputs.push(Direction[CURSES_KEYS[key]],
+                                  self.game.player_snake.direction)
+        return True
+
+    def handle_keys(self):
+        self.stdscr.timeout(0)
+        while True:
+            key = self.stdscr.getch()
+            if key == -1:
+                return True
+            if not self.handle_key(key):
+                return False
+
+    def read_key(self, timeout_ms):
+        self.stdscr.timeout(timeout_ms)
+        key = self.stdscr.getch()
+        return None if key == -1 else key
+
+    def run(self):
+        pacer = TickPacer(trial.TICK_RATE)
+        self.draw()
+        while self.ticks < trial.MATCH_TICKS:
+            if not self.handle_keys():
+                return False
+            self.game.step()
+            self.ticks += 1
+            self.game.elapsed_time = self.ticks / trial.TICK_RATE
+            self.draw()
+            self.game.inputs.presented()
+
+            # Reading keys only once per tick would start their latency
+            # clock late by however long they sat waiting
+            if not pacer.wait(self.read_key, self.handle_key):
+                return False
+        return True
+
+
+def play(stdscr, player_policy, ai_policy, fruit_count, ai_weights):
+    terminal = TerminalGame(stdscr, player_policy, ai_policy, fruit_count, ai_weights)
+    finished = terminal.run()
+    return finished, terminal.game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play snake battle in a terminal")
+    parser.add_argument("--watch", action="store_true",
+                        help="let an AI control the player snake too")
+    parser.add_argument("--player", default="heuristic",
+                        help="player policy when watching")
+    parser.add_argument("--ai", default="heuristic", help="AI snake policy")
+    parser.add_argument("--fruits", type=int, default=1, help="fruits on the board at once")
+    parser.add_argument("--ai-profile", default=trial.AI_PROFILE_PATH,
+                        help="AI weights from tune_ai.py, like trial.py uses")
+    args = parser.parse_args()
+
+    player_policy = args.player if args.watch else "human"
+    # Like trial.py, play the tuned profile when there is one
+    ai_weights = trial.load_ai_profile(args.ai_profile)
+    finished, game = curses.wrapper(play, player_policy, args.ai, args.fruits, ai_weights)
+
+    player, ai = game.player_snake.score, game.ai_snake.score
+    print(f"{'Final' if finished else 'Stopped'} - Player: {player}  AI: {ai}")
+    if game.inputs.latency_report():
+        print(game.inputs.latency_text())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 import pygame
 import random
+import sys
 import numpy as np
 from enum import Enum
 
+import board
+import hamiltonian
+from reachable import ReachableArea
+
 # Define directions as enum for clarity
 class Direction(Enum):
     UP = 1
@@ -10,8 +15,12 @@ class Direction(Enum):
     LEFT = 3
     RIGHT = 4
 
+# Same order as the board module's neighbour tables
+DIRECTIONS = tuple(Direction)
+BOARD_CELLS = 20
+
 class Snake:
-    def __init__(self, x, y, color, name):
+    def __init__(self, x, y, color, name, use_solver=False):
         """Initialize a snake with starting position, color and name"""
         self.body = [(x, y)]  # Snake body, list of positions
         self.direction = random.choice(list(Direction))  # Random starting direction
@@ -19,6 +28,8 @@ class Snake:
         self.name = name
         self.is_alive = True
         self.score = 0
+        self.use_solver = use_solver  # Follow a Hamiltonian cycle instead of greedy moves
+        self.space = None  # Free board space shared with the other snake, set by the Game
 
     def get_head(self):
         """Return the position of snake's head"""
@@ -29,54 +40,65 @@ class Snake:
         AI movement logic for the snake.
         Decides direction based on food position and collision avoidance.
         """
-        head_x, head_y = self.get_head()
+        if self.use_solver:
+            self.solver_move(food_pos, other_snake)
+            return
+
         food_x, food_y = food_pos
+        occupied = set(self.body)
+        occupied.update(other_snake.body)
 
         # Calculate possible moves
         possible_moves = []
-        for direction in Direction:
-            next_x, next_y = self.get_next_position(direction)
-            
+        for direction, next_pos in zip(DIRECTIONS, board.move_table(BOARD_CELLS)[self.get_head()]):
             # Check if move is safe (no collisions)
-            if self.is_safe_move(next_x, next_y, other_snake):
+            if next_pos is not None and next_pos not in occupied:
+                next_x, next_y = next_pos
                 # Calculate distance to food for this move
                 distance = abs(next_x - food_x) + abs(next_y - food_y)
-                possible_moves.append((direction, distance))
+                # Moves into a pocket too small for us only count as a last resort
+                trapped = self.space is not None and \
+                    self.space.is_trap((next_x, next_y), len(self.body), (self.body, other_snake.body))
+                possible_moves.append((direction, next_pos, (trapped, distance)))
 
         if possible_moves:
-            # Choose the move that gets us closest to food
-            self.direction = min(possible_moves, key=lambda x: x[1])[0]
+            # Choose the move that gets us closest to food without getting trapped
+            self.direction, next_pos, _ = min(possible_moves, key=lambda x: x[2])
         else:
             self.is_alive = False
             return
 
         # Move snake in chosen direction
-        next_x, next_y = self.get_next_position(self.direction)
-        self.body.insert(0, (next_x, next_y))
+        self.body.insert(0, next_pos)
         
         # Remove tail unless we're eating food
-        if (next_x, next_y) != food_pos:
+        if next_pos != food_pos:
             self.body.pop()
         else:
             self.score += 1
 
-    def get_next_position(self, direction):
-        """Calculate next position based on direction"""
-        head_x, head_y = self.get_head()
-        
-        if direction == Direction.UP:
-            return head_x, head_y - 1
-        elif direction == Direction.DOWN:
-            return head_x, head_y + 1
-        elif direction == Direction.LEFT:
-            return head_x - 1, head_y
-        else:  # RIGHT
-            return head_x + 1, head_y
+    def solver_move(self, food_pos, other_snake):
+        """Move along the cached Hamiltonian cycle, taking safe shortcuts to food"""
+        target = hamiltonian.next_cell(self.body, food_pos, BOARD_CELLS, set(other_snake.body))
+        for direction, next_pos in zip(DIRECTIONS, board.move_table(BOARD_CELLS)[self.get_head()]):
+            if next_pos == target:
+                self.direction = direction
+
+        # The cycle guarantees we never hit ourselves, only the other snake can block us
+        if not self.is_safe_move(target[0], target[1], other_snake) and target != self.body[-1]:
+            self.is_alive = False
+            return
+
+        self.body.insert(0, target)
+        if target != food_pos:
+            self.body.pop()
+        else:
+            self.score += 1
 
     def is_safe_move(self, x, y, other_snake):
         """Check if moving to (x,y) is safe"""
-        # Check wall collision
-        if x < 0 or x >= 20 or y < 0 or y >= 20:
+        # Check wall collision, only on-board cells are in the move table
+        if (x, y) not in board.move_table(BOARD_CELLS):
             return False
         
         # Check self collision
@@ -90,7 +112,7 @@ class Snake:
         return True
 
 class Game:
-    def __init__(self):
+    def __init__(self, red_solver=False, blue_solver=False):
         """Initialize the game"""
         pygame.init()
         self.width = 800
@@ -104,9 +126,13 @@ class Game:
         self.GRID_COLOR = (0, 255, 0)  # Neon green grid
         self.FOOD_COLOR = (255, 0, 255)  # Changed food to magenta for better visibility
 
-        # Create two snakes
-        self.snake1 = Snake(5, 5, (255, 0, 0), "Red Snake")  # Red snake
-        self.snake2 = Snake(15, 15, (0, 0, 255), "Blue Snake")  # Blue snake
+        # Create two snakes, each can follow the Hamiltonian cycle on its own.
+        # Both on the same cycle just run into each other
+        self.snake1 = Snake(5, 5, (255, 0, 0), "Red Snake", red_solver)  # Red snake
+        self.snake2 = Snake(15, 15, (0, 0, 255), "Blue Snake", blue_solver)  # Blue snake
+        self.space = ReachableArea(BOARD_CELLS)
+        self.snake1.space = self.space
+        self.snake2.space = self.space
         
         self.place_new_food()
         self.clock = pygame.time.Clock()
@@ -114,7 +140,7 @@ class Game:
     def place_new_food(self):
         """Place food at random position not occupied by snakes"""
         while True:
-            self.food_pos = (random.randint(0, 19), random.randint(0, 19))
+            self.food_pos = (random.randint(0, BOARD_CELLS - 1), random.randint(0, BOARD_CELLS - 1))
             if (self.food_pos not in self.snake1.body and 
                 self.food_pos not in self.snake2.body):
                 break
@@ -122,9 +148,11 @@ class Game:
     def update(self):
         """Update game state"""
         if self.snake1.is_alive:
+            self.space.update((self.snake1.body, self.snake2.body))
             self.snake1.move(self.food_pos, self.snake2)
             
         if self.snake2.is_alive:
+            self.space.update((self.snake1.body, self.snake2.body))
             self.snake2.move(self.food_pos, self.snake1)
 
         # Check if food was eaten
@@ -222,5 +250,6 @@ class Game:
 
 # Start the game
 if __name__ == "__main__":
-    game = Game()
+    # --solver puts the red snake on the Hamiltonian cycle, --blue-solver the blue one
+    game = Game(red_solver="--solver" in sys.argv, blue_solver="--blue-solver" in sys.argv)
     game.run()
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""Spectator wall showing many live matches in one window.
+
+Every match is a headless trial.Game. Each frame their boards are written as
+colour codes into one numpy array, turned into pixels with a single palette
+lookup straight into the wall surface's buffer (surfarray.pixels2d), and the
+whole wall is scaled to the window in one call. No per-cell drawing happens,
+so the frame cost barely depends on how many matches are shown.
+
+Click a board to zoom into that match with the normal game view, click again
+or press Escape to go back to the wall.
+
+    python spectator_wall.py --matches 64 --ai hamiltonian
+"""
+import os
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import math
+import random
+
+import numpy as np
+import pygame
+
+import trial
+
+WALL_FPS = 30
+
+GAP, EMPTY, FRUIT, PLAYER, PLAYER_HEAD, AI, AI_HEAD = range(7)
+PALETTE_COLORS = {
+    GAP: trial.BLACK,
+    EMPTY: (25, 25, 25),
+    FRUIT: trial.PURPLE,
+    PLAYER: trial.RED,
+    PLAYER_HEAD: (255, 150, 150),
+    AI: trial.BLUE,
+    AI_HEAD: (150, 150, 255),
+}
+
+
+def paint(board, body, body_code, head_code):
+    cells = np.array(body)
+    board[cells[:, 0], cells[:, 1]] = body_code
+    board[body[0]] = head_code
+
+
+class SpectatorWall:
+    def __init__(self, match_count=64, player_policy="heuristic", ai_policy="heuristic",
+                 fruit_count=1, ai_weights=None):
+        self.screen = pygame.display.set_mode((trial.WINDOW_WIDTH, trial.WINDOW_HEIGHT))
+        pygame.display.set_caption("Spectator wall")
+        self.clock = pygame.time.Clock()
+
+        # All matches share the window, it is only drawn on when zoomed in
+        self.matches = [trial.Game(screen=self.screen, player_policy=player_policy,
+                                   ai_policy=ai_policy, fruit_count=fruit_count,
+                                   ai_weights=ai_weights)
+                        for _ in range(match_count)]
+        for game in self.matches:
+            game.game_state = "PLAYING"
+        self.ticks = [0] * match_count
+        self.zoomed = None
+        self.frame = 0
+
+        # Boards sit in a grid, one pixel of gap between them
+        self.cols = math.ceil(math.sqrt(match_count))
+        self.rows = math.ceil(match_count / self.cols)
+        self.tile = trial.GRID_CELLS + 1
+        # 32-bit so pixels2d can address every pixel as one integer
+        self.wall = pygame.Surface((self.cols * self.tile, self.rows * self.tile), 0, 32)
+        self.palette = np.array([self.wall.map_rgb(PALETTE_COLORS[code])
+                                 for code in sorted(PALETTE_COLORS)], np.uint32)
+        # Board codes for every slot in the grid, including empty slots
+        self.codes = np.full((self.rows * self.cols, self.tile, self.tile), GAP, np.uint8)
+
+        scale = min(trial.WINDOW_WIDTH / self.wall.get_width(),
+                    trial.WINDOW_HEIGHT / self.wall.get_height())
+        self.wall_rect = pygame.Rect(0, 0, int(self.wall.get_width() * scale),
+                                     int(self.wall.get_height() * scale))
+        self.wall_rect.center = self.screen.get_rect().center
+        self.scaled = pygame.Surface(self.wall_rect.size, 0, self.wall)
+
+    def step_matches(self):
+        # Matches tick at TICK_RATE while the wall redraws at WALL_FPS, so
+        # spread the ticks over the frames in between to keep frames even
+        frames_per_tick = max(1, WALL_FPS // trial.TICK_RATE)
+        for i in range(self.frame % frames_per_tick, len(self.matches), frames_per_tick):
+            game = self.matches[i]
+            game.step()
+            self.ticks[i] += 1
+            game.elapsed_time = self.ticks[i] / trial.TICK_RATE
+            if self.ticks[i] >= trial.MATCH_TICKS:
+                game.reset_game()
+                game.game_state = "PLAYING"
+                self.ticks[i] = 0
+        self.frame += 1
+
+    def draw_wall(self):
+        boards = self.codes[:, :-1, :-1]
+        boards[:len(self.matches)] = EMPTY
+        for board, game in zip(boards, self.matches):
+            for fruit in game.all_fruits():
+                board[fruit] = FRUIT
+            paint(board, game.ai_snake.body, AI, AI_HEAD)
+            paint(board, game.player_snake.body, PLAYER, PLAYER_HEAD)
+
+        # Lay the (x, y) boards out as tiles of one (x, y) wall, then map
+        # codes to pixels directly into the surface memory
+        width, height = self.wall.get_size()
+        tiles = self.codes.reshape(self.rows, self.cols, self.tile, self.tile)
+        pixels = pygame.surfarray.pixels2d(self.wall)
+        pixels[:] = self.palette[tiles.transpose(1, 2, 0, 3).reshape(width, height)]
+        del pixels  # unlock the surface before scaling it
+
+        pygame.transform.scale(self.wall, self.wall_rect.size, self.scaled)
+        self.screen.blit(self.scaled, self.wall_rect)
+
+    def match_at(self, pos):
+        if not self.wall_rect.collidepoint(pos):
+            return None
+        x = (pos[0] - self.wall_rect.x) * self.wall.get_width() // self.wall_rect.width
+        y = (pos[1] - self.wall_rect.y) * self.wall.get_height() // self.wall_rect.height
+        index = (y // self.tile) * self.cols + x // self.tile
+        return index if index < len(self.matches) else None
+
+    def run(self):
+        running = True
+        elapsed = 0
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    self.zoomed = self.match_at(event.pos) if self.zoomed is None else None
+                    self.screen.fill(trial.BLACK)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    self.zoomed = None
+                    self.screen.fill(trial.BLACK)
+
+            self.step_matches()
+            if self.zoomed is None:
+                self.draw_wall()
+            else:
+                self.matches[self.zoomed].draw_game()
+            pygame.display.flip()
+
+            elapsed += self.clock.tick(WALL_FPS)
+            if elapsed >= 1000:
+                elapsed = 0
+                title = "Spectator wall" if self.zoomed is None else f"Match {self.zoomed}"
+                pygame.display.set_caption(f"{title} - {self.clock.get_fps():.0f} fps")
+
+        pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch many AI matches at once")
+    parser.add_argument("--matches", type=int, default=64)
+    parser.add_argument("--player", default="heuristic", help="player snake policy")
+    parser.add_argument("--ai", default="heuristic", help="AI snake policy")
+    parser.add_argument("--fruits", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--ai-profile", help="AI weights from tune_ai.py, defaults otherwise")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    ai_weights = trial.load_ai_profile(args.ai_profile, missing_ok=False) if args.ai_profile else None
+    SpectatorWall(args.matches, args.player, args.ai, args.fruits, ai_weights).run()
+
+
+if __name__ == "__main__":
+    main()
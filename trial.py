@@ -5,13 +5,22 @@ import numpy as np
 from enum import Enum
 from collections import deque
 import time
+import sys
+import os
+import json
+
+import board
+import hamiltonian
+from input_queue import InputQueue, KEY_DIRECTIONS, TickPacer, wait_event
+from fruit_index import FruitIndex, manhattan
+from reachable import ReachableArea
 
 # Initialize Pygame
 pygame.init()
 # Initialize mixer for sound effects
 mixer.init()
 # Load the eating sound effect
-eating_sound = mixer.Sound('eat.wav')  
+eating_sound = mixer.Sound(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eat.wav'))
 
 # Constants
 WINDOW_WIDTH = 1000
@@ -20,6 +29,30 @@ GRID_SIZE = 600
 CELL_SIZE = 20
 GRID_CELLS = GRID_SIZE // CELL_SIZE
 GAME_DURATION = 100  # seconds
+TICK_RATE = 10  # simulation ticks per second
+MATCH_TICKS = GAME_DURATION * TICK_RATE  # ticks in a full match
+
+# Menu screens
+MENU_FPS = 8
+MENU_CYCLE = np.pi  # seconds, every menu animation repeats after this
+MENU_FRAMES = round(MENU_CYCLE * MENU_FPS)  # pre-rendered frames per cycle
+MENU_ANIMATION_SECONDS = 30  # stop animating after this long without input
+MENU_IDLE_TIMEOUT = 1000  # ms to block waiting for events when idle
+DECORATIVE_SIZE = 64  # surface size holding one decorative snake
+FRUIT_CANDIDATES = 4  # nearest fruits an AI weighs up in multi-fruit mode
+
+# Heuristic AI parameters, tune_ai.py searches for better ones
+AI_WEIGHTS = {
+    "fruit_weight": 2,  # pull towards the fruit
+    "other_snake_weight": 3,  # push away from the other snake
+    "memory_penalty": 5,  # for revisiting a recent position
+    "memory_size": 50,  # recent positions remembered
+    "stuck_window": 10,  # positions needed before checking for loops
+    "stuck_unique": 5,  # fewer unique recent positions than this looks stuck
+    "stuck_limit": 5,  # stuck checks in a row before a random escape
+    "trap_penalty": 100,  # for moving into a pocket smaller than the snake
+}
+AI_PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_profile.json")
 
 # Colors
 WHITE = (255, 255, 255)
@@ -36,56 +69,67 @@ class Direction(Enum):
     LEFT = (-1, 0)
     RIGHT = (1, 0)
 
+# Same order as the board module's neighbour tables
+DIRECTIONS = tuple(Direction)
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+
+def load_ai_profile(path=AI_PROFILE_PATH, missing_ok=True):
+    # A tuned profile overrides the defaults, missing keys keep them
+    weights = dict(AI_WEIGHTS)
+    if missing_ok and not os.path.exists(path):
+        return weights
+    with open(path) as f:
+        weights.update((k, v) for k, v in json.load(f).items() if k in AI_WEIGHTS)
+    return weights
+
 class Snake:
-    def __init__(self, x, y, color, is_ai=False):
+    def __init__(self, x, y, color, is_ai=False, weights=None):
         self.body = [(x, y)]
         self.direction = Direction.RIGHT
         self.color = color
         self.score = 0
         self.is_ai = is_ai
-        self.memory = deque(maxlen=50) if is_ai else None
+        self.weights = dict(AI_WEIGHTS, **(weights or {}))
+        self.memory = deque(maxlen=int(self.weights["memory_size"])) if is_ai else None
         self.stuck_counter = 0 if is_ai else None
+        self.space = None  # shared ReachableArea, set by the Game
 
-    def move(self, fruit_pos=None, other_snake=None):
-        current = self.body[0]
-        direction = self.direction.value
-        new_head = (current[0] + direction[0], current[1] + direction[1])
+    def move(self, fruit_pos=None, other_snake=None, fruits=None):
+        moves = board.move_table(GRID_CELLS)[self.body[0]]
+        new_head = moves[DIRECTION_INDEX[self.direction]]
 
         # Handle wall collision
-        if new_head[0] < 0 or new_head[0] >= GRID_CELLS or \
-           new_head[1] < 0 or new_head[1] >= GRID_CELLS:
-            # Choose random new direction
-            available_directions = list(Direction)
-            available_directions.remove(self.direction)
-            self.direction = random.choice(available_directions)
-            direction = self.direction.value
-            new_head = (current[0] + direction[0], current[1] + direction[1])
+        if new_head is None:
+            # Choose random new direction that stays on the board
+            self.direction, new_head = random.choice(
+                [(direction, pos) for direction, pos in zip(DIRECTIONS, moves) if pos is not None])
 
         self.body.insert(0, new_head)
         if self.is_ai:
             self.memory.append(new_head)
 
-        # Remove tail unless eating fruit
-        if new_head != fruit_pos:
+        # Remove tail unless eating fruit, any fruit counts in multi-fruit mode
+        ate = new_head in fruits if fruits is not None else new_head == fruit_pos
+        if not ate:
             self.body.pop()
 
-        return new_head == fruit_pos
+        return ate
 
-    def ai_move(self, fruit_pos, other_snake):
+    def ai_move(self, fruit_pos, other_snake, fruits=None):
         if not self.is_ai:
             return False
 
         # Get current position
         head = self.body[0]
+        weights = self.weights
+        occupied = set(self.body)
+        occupied.update(other_snake.body)
         
         # Calculate distances
         distances = []
-        for direction in Direction:
-            next_pos = (head[0] + direction.value[0], 
-                       head[1] + direction.value[1])
-            
+        for direction, next_pos in zip(DIRECTIONS, board.move_table(GRID_CELLS)[head]):
             # Check if move is valid
-            if self.is_valid_move(next_pos, other_snake):
+            if next_pos is not None and next_pos not in occupied:
                 # Calculate metrics
                 fruit_distance = abs(next_pos[0] - fruit_pos[0]) + \
                                abs(next_pos[1] - fruit_pos[1])
@@ -93,12 +137,19 @@ class Snake:
                                         for x, y in other_snake.body)
                 
                 # Check if position is in recent memory
-                memory_penalty = 5 if next_pos in self.memory else 0
+                memory_penalty = weights["memory_penalty"] if next_pos in self.memory else 0
+
+                # Check if the move leads into a pocket we can't get out of
+                trap_penalty = 0
+                if self.space is not None and \
+                   self.space.is_trap(next_pos, len(self.body), (self.body, other_snake.body)):
+                    trap_penalty = weights["trap_penalty"]
                 
                 # Calculate score for this move
-                score = (-fruit_distance * 2 +  # Want to get closer to fruit
-                        other_snake_distance * 3 +  # Want to stay away from other snake
-                        -memory_penalty)  # Avoid recently visited positions
+                score = (-fruit_distance * weights["fruit_weight"] +  # Want to get closer to fruit
+                        other_snake_distance * weights["other_snake_weight"] +  # Want to stay away from other snake
+                        -memory_penalty +  # Avoid recently visited positions
+                        -trap_penalty)  # Avoid dead ends
                 
                 distances.append((direction, score))
 
@@ -107,54 +158,82 @@ class Snake:
             self.direction = max(distances, key=lambda x: x[1])[0]
             
             # Increment stuck counter if not moving towards fruit
-            if len(self.memory) >= 10:
+            if len(self.memory) >= weights["stuck_window"]:
                 unique_positions = len(set(self.memory))
-                if unique_positions < 5:  # Snake might be stuck
+                if unique_positions < weights["stuck_unique"]:  # Snake might be stuck
                     self.stuck_counter += 1
-                    if self.stuck_counter > 5:
+                    if self.stuck_counter > weights["stuck_limit"]:
                         # Choose random direction to escape
-                        self.direction = random.choice(list(Direction))
+                        self.direction = random.choice(DIRECTIONS)
                         self.stuck_counter = 0
                         self.memory.clear()
                 else:
                     self.stuck_counter = 0
 
-        return self.move(fruit_pos, other_snake)
+        return self.move(fruit_pos, other_snake, fruits)
 
-    def is_valid_move(self, pos, other_snake):
-        # Check boundaries
-        if pos[0] < 0 or pos[0] >= GRID_CELLS or \
-           pos[1] < 0 or pos[1] >= GRID_CELLS:
-            return False
-        
-        # Check self collision
-        if pos in self.body:
-            return False
-            
-        # Check other snake collision
-        if pos in other_snake.body:
-            return False
-            
-        return True
+    def solver_move(self, fruit_pos, other_snake, fruits=None):
+        # Follow the cached Hamiltonian cycle, shortcutting towards the fruit
+        head = self.body[0]
+        target = hamiltonian.next_cell(self.body, fruit_pos, GRID_CELLS,
+                                       set(other_snake.body))
+        self.direction = Direction((target[0] - head[0], target[1] - head[1]))
+        return self.move(fruit_pos, other_snake, fruits)
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Snake Battle!")
+    def __init__(self, screen=None, player_policy="human", ai_policy="heuristic",
+                 fruit_count=1, ai_weights=None, player_weights=None):
+        # Any surface can be passed in to render offscreen instead of to a window
+        if screen is None:
+            screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption("Snake Battle!")
+        self.screen = screen
+        self.player_policy = player_policy
+        self.ai_policy = ai_policy
+        self.fruit_count = fruit_count
+        # Snakes play AI_WEIGHTS unless given others, so seeded games replay the same
+        self.ai_weights = ai_weights
+        self.player_weights = player_weights
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
+        self.inputs = InputQueue()
+        self.pacer = TickPacer(TICK_RATE)
+        self.show_debug = False  # F3 toggles the debug HUD
+        self.menu_frames = None
         self.reset_game()
 
     def reset_game(self):
         # Initialize snakes at opposite corners
-        self.player_snake = Snake(5, 5, RED)
-        self.ai_snake = Snake(GRID_CELLS-5, GRID_CELLS-5, BLUE, is_ai=True)
+        self.player_snake = Snake(5, 5, RED, is_ai=self.player_policy != "human",
+                                  weights=self.player_weights)
+        self.ai_snake = Snake(GRID_CELLS-5, GRID_CELLS-5, BLUE, is_ai=True,
+                              weights=self.ai_weights)
+        # Free board space, kept up to date for the heuristic AIs
+        self.space = ReachableArea(GRID_CELLS)
+        self.player_snake.space = self.space
+        self.ai_snake.space = self.space
+        # Many fruits live in a spatial index, a single one in fruit_pos
+        self.fruits = FruitIndex(GRID_CELLS) if self.fruit_count > 1 else None
         self.place_fruit()
+        self.inputs.clear()
         self.game_state = "START"
         self.start_time = None
         self.elapsed_time = 0
+        self.menu_input_time = time.time()
+        self.game_over_texts = None
+        self.pacer.reset()
+
+    def place_fruit(self, eaten=None):
+        if self.fruits is not None:
+            if eaten is not None:
+                self.fruits.remove(eaten)
+            while len(self.fruits) < self.fruit_count:
+                pos = (random.randint(0, GRID_CELLS-1), random.randint(0, GRID_CELLS-1))
+                if pos not in self.fruits and pos not in self.player_snake.body and \
+                   pos not in self.ai_snake.body:
+                    self.fruits.add(pos)
+            return
 
-    def place_fruit(self):
         while True:
             self.fruit_pos = (random.randint(0, GRID_CELLS-1),
                             random.randint(0, GRID_CELLS-1))
@@ -162,6 +241,66 @@ class Game:
                self.fruit_pos not in self.ai_snake.body:
                 break
 
+    def all_fruits(self):
+        return self.fruits if self.fruits is not None else (self.fruit_pos,)
+
+    def target_fruit(self, snake, other_snake):
+        # Of the closest few fruits, prefer one we reach before the other snake
+        head = snake.body[0]
+        other_head = other_snake.body[0]
+        return min(self.fruits.k_nearest(head, FRUIT_CANDIDATES),
+                   key=lambda fruit: (manhattan(other_head, fruit) < manhattan(head, fruit),
+                                      manhattan(head, fruit)))
+
+    def move_snake(self, snake, policy, other_snake):
+        if self.fruits is None:
+            fruit_pos = self.fruit_pos
+        elif policy != "human":
+            fruit_pos = self.target_fruit(snake, other_snake)
+        else:
+            fruit_pos = None
+        if policy == "heuristic":
+            self.space.update((self.player_snake.body, self.ai_snake.body))
+            return snake.ai_move(fruit_pos, other_snake, self.fruits)
+        if policy == "hamiltonian":
+            return snake.solver_move(fruit_pos, other_snake, self.fruits)
+        return snake.move(fruit_pos, other_snake, self.fruits)
+
+    def step(self):
+        self.step_player()
+        self.step_ai()
+        self.check_collisions()
+
+    # The AI snake moves after the player snake and sees where it went,
+    # step() is split up so recorders can look at the board in between
+    def step_player(self):
+        # Apply at most one queued turn per tick
+        if self.player_policy == "human":
+            self.inputs.apply(self.player_snake)
+
+        if self.move_snake(self.player_snake, self.player_policy, self.ai_snake):
+            self.player_snake.score += 1
+            eating_sound.play()
+            self.place_fruit(self.player_snake.body[0])
+
+    def step_ai(self):
+        if self.move_snake(self.ai_snake, self.ai_policy, self.player_snake):
+            self.ai_snake.score += 1
+            eating_sound.play()
+            self.place_fruit(self.ai_snake.body[0])
+
+    def check_collisions(self):
+        player_head = self.player_snake.body[0]
+        ai_head = self.ai_snake.body[0]
+
+        # Check if player snake collides with AI snake's body
+        if player_head in self.ai_snake.body[1:]:
+            self.player_snake.score = max(0, self.player_snake.score - 1)
+
+        # Check if AI snake collides with player snake's body
+        if ai_head in self.player_snake.body[1:]:
+            self.ai_snake.score = max(0, self.ai_snake.score - 1)
+
     def draw_snake(self, snake):
         # Draw body
         for segment in snake.body:
@@ -201,45 +340,128 @@ class Game:
                          (head_x + 2*CELL_SIZE//3, head_y + CELL_SIZE//3),
                          pupil_radius)
 
+    def build_menu_cache(self):
+        # Render one full animation cycle of the menu screens up front, so
+        # idle menus only blit instead of scaling text and redrawing snakes
+        title = pygame.font.Font(None, 80).render("SNAKE BATTLE!", True, YELLOW)
+        game_over = pygame.font.Font(None, 74).render("GAME OVER!", True, YELLOW)
+
+        def pulse(surface, scale):
+            return pygame.transform.scale(surface,
+                (int(surface.get_width() * scale),
+                 int(surface.get_height() * scale)))
+
+        self.menu_frames = []
+        for i in range(MENU_FRAMES):
+            time_val = i * MENU_CYCLE / MENU_FRAMES
+            scale = 1.0 + 0.1 * np.sin(time_val * 2)
+            snakes = []
+            for color in (RED, BLUE):
+                surface = pygame.Surface((DECORATIVE_SIZE, DECORATIVE_SIZE), pygame.SRCALPHA)
+                self.draw_decorative_snake(surface, (DECORATIVE_SIZE // 2, DECORATIVE_SIZE // 2),
+                                           color, time_val)
+                snakes.append(surface)
+            self.menu_frames.append({
+                "title": pulse(title, scale),
+                "game_over": pulse(game_over, scale),
+                "glow_size": 10 * (1 + 0.2 * np.sin(time_val * 4)),
+                "snakes": snakes,
+            })
+
+        self.play_text = pygame.font.Font(None, 50).render("PLAY!", True, BLACK)
+        self.play_again_text = self.font.render("Play Again!", True, BLACK)
+
+    def menu_animating(self):
+        return (pygame.display.get_active() and
+                time.time() - self.menu_input_time < MENU_ANIMATION_SECONDS)
+
+    def menu_frame(self):
+        if self.menu_frames is None:
+            self.build_menu_cache()
+        if not self.menu_animating():
+            return self.menu_frames[0]
+        time_val = pygame.time.get_ticks() / 1000
+        return self.menu_frames[int(time_val / MENU_CYCLE * MENU_FRAMES) % MENU_FRAMES]
+
+    def menu_events(self):
+        if self.menu_animating():
+            events = pygame.event.get()
+        else:
+            # Nothing is moving, so show the frame and sleep until input
+            pygame.display.flip()
+            event = pygame.event.wait(MENU_IDLE_TIMEOUT)
+            events = [] if event.type == pygame.NOEVENT else [event]
+            events += pygame.event.get()
+
+        for event in events:
+            if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                self.menu_input_time = time.time()
+        return events
+
+    def draw_menu_button(self, button_rect, text, glow_size):
+        glow_rect = button_rect.inflate(glow_size, glow_size)
+        pygame.draw.rect(self.screen, (0, 150, 0), glow_rect, border_radius=15)
+        pygame.draw.rect(self.screen, NEON_GREEN, button_rect, border_radius=10)
+        self.screen.blit(text, text.get_rect(center=button_rect.center))
+
+    def draw_menu_snakes(self, frame):
+        for surface, pos in zip(frame["snakes"], ((200, 600), (800, 600))):
+            self.screen.blit(surface, surface.get_rect(center=pos))
+
     def draw_start_screen(self):
+        frame = self.menu_frame()
         self.screen.fill(BLACK)
         
-        # Create animated title
-        title_font = pygame.font.Font(None, 80)
-        time_val = pygame.time.get_ticks() / 1000
-        title_scale = 1.0 + 0.1 * np.sin(time_val * 2)
-        title = title_font.render("SNAKE BATTLE!", True, YELLOW)
-        title = pygame.transform.scale(title, 
-            (int(title.get_width() * title_scale), 
-             int(title.get_height() * title_scale)))
-        title_rect = title.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//3))
-        self.screen.blit(title, title_rect)
-
-        # Create animated play button
-        button_color = NEON_GREEN
+        # Animated title
+        title_rect = frame["title"].get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//3))
+        self.screen.blit(frame["title"], title_rect)
+
+        # Animated play button
         button_rect = pygame.Rect(0, 0, 200, 60)
         button_rect.center = (WINDOW_WIDTH//2, WINDOW_HEIGHT//2)
+        self.draw_menu_button(button_rect, self.play_text, frame["glow_size"])
         
-        # Add glow effect
-        glow_size = 10 * (1 + 0.2 * np.sin(time_val * 4))
-        glow_rect = button_rect.inflate(glow_size, glow_size)
-        pygame.draw.rect(self.screen, (0, 150, 0), glow_rect, border_radius=15)
-        pygame.draw.rect(self.screen, button_color, button_rect, border_radius=10)
-        
-        # Add button text
-        play_font = pygame.font.Font(None, 50)
-        play_text = play_font.render("PLAY!", True, BLACK)
-        text_rect = play_text.get_rect(center=button_rect.center)
-        self.screen.blit(play_text, text_rect)
-        
-        # Draw decorative snakes
-        self.draw_decorative_snake((200, 600), RED)
-        self.draw_decorative_snake((800, 600), BLUE)
-        
+        self.draw_menu_snakes(frame)
         return button_rect
 
-    def draw_decorative_snake(self, pos, color):
-        time_val = pygame.time.get_ticks() / 1000
+    def draw_game_over_screen(self):
+        frame = self.menu_frame()
+        self.screen.fill(BLACK)
+
+        if self.game_over_texts is None:
+            # Determine winner
+            if self.player_snake.score > self.ai_snake.score:
+                result_text = "You Won! 😎"
+                winner_color = RED
+            elif self.ai_snake.score > self.player_snake.score:
+                result_text = "You lost 🥺"
+                winner_color = BLUE
+            else:
+                result_text = "It's a Tie!"
+                winner_color = YELLOW
+
+            result = pygame.font.Font(None, 74).render(result_text, True, winner_color)
+            score_text = f"Final Scores - Player: {self.player_snake.score}  AI: {self.ai_snake.score}"
+            score_surface = self.font.render(score_text, True, WHITE)
+            self.game_over_texts = [
+                (result, result.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))),
+                (score_surface, score_surface.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 100))),
+            ]
+
+        game_over_rect = frame["game_over"].get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//3))
+        self.screen.blit(frame["game_over"], game_over_rect)
+        for surface, rect in self.game_over_texts:
+            self.screen.blit(surface, rect)
+
+        # Play again button
+        button_rect = pygame.Rect(0, 0, 250, 60)
+        button_rect.center = (WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 200)
+        self.draw_menu_button(button_rect, self.play_again_text, frame["glow_size"])
+
+        self.draw_menu_snakes(frame)
+        return button_rect
+
+    def draw_decorative_snake(self, surface, pos, color, time_val):
         segments = []
         
         # Create wavy motion
@@ -252,17 +474,17 @@ class Game:
         for i in range(len(segments)-1):
             start = segments[i]
             end = segments[i+1]
-            pygame.draw.line(self.screen, color, start, end, 5)
-            pygame.draw.circle(self.screen, color, start, 5)
+            pygame.draw.line(surface, color, start, end, 5)
+            pygame.draw.circle(surface, color, start, 5)
         
         # Draw head
-        pygame.draw.circle(self.screen, color, segments[0], 10)
+        pygame.draw.circle(surface, color, segments[0], 10)
         
         # Draw eyes
         eye_offset = 3
-        pygame.draw.circle(self.screen, WHITE, 
+        pygame.draw.circle(surface, WHITE, 
                          (segments[0][0] - eye_offset, segments[0][1] - eye_offset), 2)
-        pygame.draw.circle(self.screen, WHITE, 
+        pygame.draw.circle(surface, WHITE, 
                          (segments[0][0] + eye_offset, segments[0][1] - eye_offset), 2)
 
     def draw_game(self):
@@ -283,10 +505,11 @@ class Game:
                            (self.grid_offset_x + GRID_SIZE, self.grid_offset_y + y * CELL_SIZE))
         
         # Draw fruit
-        fruit_x = self.grid_offset_x + self.fruit_pos[0] * CELL_SIZE
-        fruit_y = self.grid_offset_y + self.fruit_pos[1] * CELL_SIZE
-        pygame.draw.rect(self.screen, PURPLE,
-                        (fruit_x, fruit_y, CELL_SIZE, CELL_SIZE))
+        for fruit in self.all_fruits():
+            fruit_x = self.grid_offset_x + fruit[0] * CELL_SIZE
+            fruit_y = self.grid_offset_y + fruit[1] * CELL_SIZE
+            pygame.draw.rect(self.screen, PURPLE,
+                            (fruit_x, fruit_y, CELL_SIZE, CELL_SIZE))
         
         # Draw snakes
         self.draw_snake(self.player_snake)
@@ -303,13 +526,29 @@ class Game:
         timer_surface = self.font.render(timer_text, True, WHITE)
         self.screen.blit(timer_surface, (WINDOW_WIDTH - 150, 20))
 
+        if self.show_debug:
+            debug_surface = self.font.render(self.inputs.latency_text(), True, YELLOW)
+            self.screen.blit(debug_surface, (20, WINDOW_HEIGHT - 40))
+
+    def handle_play_event(self, event):
+        """Handle an event during play, returning False on quit."""
+        if event.type == pygame.QUIT:
+            return False
+        if event.type == pygame.KEYDOWN:
+            if event.key in KEY_DIRECTIONS:
+                self.inputs.push(Direction[KEY_DIRECTIONS[event.key]],
+                                 self.player_snake.direction)
+            elif event.key == pygame.K_F3:
+                self.show_debug = not self.show_debug
+        return True
+
     def run(self):
         running = True
         while running:
             if self.game_state == "START":
                 play_button = self.draw_start_screen()
                 
-                for event in pygame.event.get():
+                for event in self.menu_events():
                     if event.type == pygame.QUIT:
                         running = False
                     elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -323,111 +562,21 @@ class Game:
                 
                 if self.elapsed_time >= GAME_DURATION:
                     self.game_state = "GAME_OVER"
+                    self.menu_input_time = time.time()
                     continue
                 
                 for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_LEFT and \
-                           self.player_snake.direction != Direction.RIGHT:
-                            self.player_snake.direction = Direction.LEFT
-                        elif event.key == pygame.K_RIGHT and \
-                             self.player_snake.direction != Direction.LEFT:
-                            self.player_snake.direction = Direction.RIGHT
-                        elif event.key == pygame.K_UP and \
-                             self.player_snake.direction != Direction.DOWN:
-                            self.player_snake.direction = Direction.UP
-                        elif event.key == pygame.K_DOWN and \
-                             self.player_snake.direction != Direction.UP:
-                            self.player_snake.direction = Direction.DOWN
-                
-                # Move snakes
-                if self.player_snake.move(self.fruit_pos, self.ai_snake):
-                    self.player_snake.score += 1
-                    eating_sound.play()
-                    self.place_fruit()
+                    running = self.handle_play_event(event) and running
                 
-                if self.ai_snake.ai_move(self.fruit_pos, self.player_snake):
-                    self.ai_snake.score += 1
-                    eating_sound.play()
-                    self.place_fruit()
-
-                player_head = self.player_snake.body[0]
-                ai_head = self.ai_snake.body[0]
-
-                # Check if player snake collides with AI snake's body
-                if player_head in self.ai_snake.body[1:]:
-                    self.player_snake.score = max(0, self.player_snake.score - 1)
-
-                # Check if AI snake collides with player snake's body
-                if ai_head in self.player_snake.body[1:]:
-                    self.ai_snake.score = max(0, self.ai_snake.score - 1)
+                self.step()
 
                 # Draw game state
                 self.draw_game()
 
             elif self.game_state == "GAME_OVER":
-                self.screen.fill(BLACK)
-                
-                # Determine winner
-                winner_text = "GAME OVER!"
-                if self.player_snake.score > self.ai_snake.score:
-                    result_text = "You Won! 😎"
-                    winner_color = RED
-                elif self.ai_snake.score > self.player_snake.score:
-                    result_text = "You lost 🥺"
-                    winner_color = BLUE
-                else:
-                    result_text = "It's a Tie!"
-                    winner_color = YELLOW
-
-                # Create animated game over text
-                game_over_font = pygame.font.Font(None, 74)
-                time_val = pygame.time.get_ticks() / 1000
-                scale = 1.0 + 0.1 * np.sin(time_val * 2)
-                
-                game_over = game_over_font.render(winner_text, True, YELLOW)
-                game_over = pygame.transform.scale(game_over, 
-                    (int(game_over.get_width() * scale), 
-                     int(game_over.get_height() * scale)))
-                game_over_rect = game_over.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//3))
-                
-                # Create result text
-                result = game_over_font.render(result_text, True, winner_color)
-                result_rect = result.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
-
-                # Display final scores
-                score_text = f"Final Scores - Player: {self.player_snake.score}  AI: {self.ai_snake.score}"
-                score_surface = self.font.render(score_text, True, WHITE)
-                score_rect = score_surface.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 100))
-
-                # Create play again button
-                button_color = NEON_GREEN
-                button_rect = pygame.Rect(0, 0, 250, 60)
-                button_rect.center = (WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 200)
-                
-                # Add glow effect to button
-                glow_size = 10 * (1 + 0.2 * np.sin(time_val * 4))
-                glow_rect = button_rect.inflate(glow_size, glow_size)
-                pygame.draw.rect(self.screen, (0, 150, 0), glow_rect, border_radius=15)
-                pygame.draw.rect(self.screen, button_color, button_rect, border_radius=10)
-                
-                # Add button text
-                play_again_text = self.font.render("Play Again!", True, BLACK)
-                text_rect = play_again_text.get_rect(center=button_rect.center)
-
-                # Draw everything
-                self.screen.blit(game_over, game_over_rect)
-                self.screen.blit(result, result_rect)
-                self.screen.blit(score_surface, score_rect)
-                self.screen.blit(play_again_text, text_rect)
+                button_rect = self.draw_game_over_screen()
 
-                # Draw decorative snakes
-                self.draw_decorative_snake((200, 600), RED)
-                self.draw_decorative_snake((800, 600), BLUE)
-
-                for event in pygame.event.get():
+                for event in self.menu_events():
                     if event.type == pygame.QUIT:
                         running = False
                     elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -435,10 +584,21 @@ class Game:
                             self.reset_game()
 
             pygame.display.flip()
-            self.clock.tick(10)
-
+            self.inputs.presented()
+            if self.game_state == "PLAYING":
+                # Reading events only once per tick would start a key's
+                # latency clock up to a whole tick late
+                running = self.pacer.wait(wait_event, self.handle_play_event) and running
+            else:
+                self.clock.tick(MENU_FPS)
+
+        if self.inputs.latency_report():
+            print(self.inputs.latency_text())
         pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
+    # python trial.py hamiltonian  switches the AI to the cycle solver
+    # The AI snake plays the tuned profile when there is one
+    game = Game(ai_policy=sys.argv[1] if len(sys.argv) > 1 else "heuristic",
+                ai_weights=load_ai_profile())
     game.run()
\ No newline at end of file
@@ -5,14 +5,22 @@ import numpy as np
 from enum import Enum
 from collections import deque
 import time
+import sys
+import os
+
+import board
+import hamiltonian
+from input_queue import InputQueue, KEY_DIRECTIONS, TickPacer, swipe_direction, wait_event
+from render_quality import QualityGovernor, GRID, EYES, PUPILS
 
 # Initialize Pygame
 pygame.init()
 mixer.init()
-eating_sound = mixer.Sound('eat.wav')
+eating_sound = mixer.Sound(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eat.wav'))
 
 # Constants
 GAME_DURATION = 100  # seconds
+FPS = 30
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 NEON_GREEN = (57, 255, 20)
@@ -20,6 +28,8 @@ RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 PURPLE = (255, 0, 255)
 YELLOW = (255, 255, 0)
+GRID_COLOR = (30, 30, 30)
+LOGICAL_CELL_PIXELS = 4  # Board pixels per cell in the "logical" render mode
 
 class Direction(Enum):
     UP = (0, -1)
@@ -27,6 +37,10 @@ class Direction(Enum):
     LEFT = (-1, 0)
     RIGHT = (1, 0)
 
+# Same order as the board module's neighbour tables
+DIRECTIONS = tuple(Direction)
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+
 class Snake:
     def __init__(self, x, y, color, is_ai=False):
         self.body = [(x, y)]
@@ -38,17 +52,12 @@ class Snake:
         self.stuck_counter = 0 if is_ai else None
 
     def move(self, fruit_pos=None, other_snake=None):
-        current = self.body[0]
-        direction = self.direction.value
-        new_head = (current[0] + direction[0], current[1] + direction[1])
-
-        if new_head[0] < 0 or new_head[0] >= self.game_cells or \
-           new_head[1] < 0 or new_head[1] >= self.game_cells:
-            available_directions = list(Direction)
-            available_directions.remove(self.direction)
-            self.direction = random.choice(available_directions)
-            direction = self.direction.value
-            new_head = (current[0] + direction[0], current[1] + direction[1])
+        moves = board.move_table(self.game_cells)[self.body[0]]
+        new_head = moves[DIRECTION_INDEX[self.direction]]
+
+        if new_head is None:
+            self.direction, new_head = random.choice(
+                [(direction, pos) for direction, pos in zip(DIRECTIONS, moves) if pos is not None])
 
         self.body.insert(0, new_head)
         if self.is_ai:
@@ -63,12 +72,23 @@ class Snake:
         # [Previous AI move logic remains the same]
         pass
 
+    def solver_move(self, fruit_pos, other_snake):
+        head = self.body[0]
+        target = hamiltonian.next_cell(self.body, fruit_pos, self.game_cells,
+                                       set(other_snake.body))
+        self.direction = Direction((target[0] - head[0], target[1] - head[1]))
+        return self.move(fruit_pos, other_snake)
+
     def is_valid_move(self, pos, other_snake):
         # [Previous validation logic remains the same]
         pass
 
 class Game:
-    def __init__(self):
+    def __init__(self, ai_policy="heuristic", render_mode="native"):
+        self.ai_policy = ai_policy
+        # "logical" draws the board at LOGICAL_CELL_PIXELS per cell and
+        # upscales it once per frame, so fill cost ignores screen resolution
+        self.render_mode = render_mode
         # Initialize display
         pygame.display.init()
         
@@ -92,12 +112,23 @@ class Game:
         self.GRID_SIZE = min(self.WINDOW_WIDTH, self.WINDOW_HEIGHT) * 0.8
         self.CELL_SIZE = self.GRID_SIZE // 30
         self.GRID_CELLS = int(self.GRID_SIZE // self.CELL_SIZE)
+        if self.ai_policy == "hamiltonian":
+            # A Hamiltonian cycle only exists with an even number of cells per side
+            self.GRID_CELLS -= self.GRID_CELLS % 2
+            self.GRID_SIZE = self.GRID_CELLS * self.CELL_SIZE
         
         # Initialize game objects
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, int(self.WINDOW_HEIGHT * 0.05))
         self.touch_start = None
         self.min_swipe_distance = 30
+        if self.render_mode == "logical":
+            self.setup_logical_board()
+        self.inputs = InputQueue()
+        self.pacer = TickPacer(FPS)
+        self.show_debug = False
+        # Drops drawing detail when frames take longer than the frame rate allows
+        self.quality = QualityGovernor(1000 / FPS)
         
         # Initialize game state
         self.reset_game()
@@ -111,9 +142,11 @@ class Game:
         self.ai_snake.game_cells = self.GRID_CELLS
         
         self.place_fruit()
+        self.inputs.clear()
         self.game_state = "START"
         self.start_time = None
         self.elapsed_time = 0
+        self.pacer.reset()
 
     def place_fruit(self):
         while True:
@@ -136,20 +169,28 @@ class Game:
             dx = end_x - self.touch_start[0]
             dy = end_y - self.touch_start[1]
             
-            if abs(dx) > self.min_swipe_distance or abs(dy) > self.min_swipe_distance:
-                if abs(dx) > abs(dy):
-                    if dx > 0 and self.player_snake.direction != Direction.LEFT:
-                        self.player_snake.direction = Direction.RIGHT
-                    elif dx < 0 and self.player_snake.direction != Direction.RIGHT:
-                        self.player_snake.direction = Direction.LEFT
-                else:
-                    if dy > 0 and self.player_snake.direction != Direction.UP:
-                        self.player_snake.direction = Direction.DOWN
-                    elif dy < 0 and self.player_snake.direction != Direction.DOWN:
-                        self.player_snake.direction = Direction.UP
+            direction = swipe_direction(dx, dy, self.min_swipe_distance)
+            if direction:
+                self.inputs.push(Direction[direction], self.player_snake.direction,
+                                 source="swipe")
             
             self.touch_start = None
 
+    def handle_play_event(self, event):
+        """Handle an event during play, returning False on quit."""
+        if event.type == pygame.QUIT:
+            return False
+        if event.type in (pygame.FINGERDOWN, pygame.FINGERUP):
+            self.handle_touch_events(event)
+        # Fallback keyboard controls for testing
+        elif event.type == pygame.KEYDOWN:
+            if event.key in KEY_DIRECTIONS:
+                self.inputs.push(Direction[KEY_DIRECTIONS[event.key]],
+                                 self.player_snake.direction)
+            elif event.key == pygame.K_F3:
+                self.show_debug = not self.show_debug
+        return True
+
     def draw_snake(self, snake):
         for segment in snake.body:
             x = self.grid_offset_x + segment[0] * self.CELL_SIZE
@@ -163,6 +204,9 @@ class Game:
         
         pygame.draw.rect(self.screen, snake.color,
                         (head_x, head_y, self.CELL_SIZE, self.CELL_SIZE))
+
+        if not self.quality.draws(EYES):
+            return
         
         eye_radius = self.CELL_SIZE // 6
         pygame.draw.circle(self.screen, WHITE,
@@ -171,6 +215,9 @@ class Game:
         pygame.draw.circle(self.screen, WHITE,
                          (head_x + 2*self.CELL_SIZE//3, head_y + self.CELL_SIZE//3),
                          eye_radius)
+
+        if not self.quality.draws(PUPILS):
+            return
         
         pupil_radius = eye_radius // 2
         pygame.draw.circle(self.screen, BLACK,
@@ -180,7 +227,72 @@ class Game:
                          (head_x + 2*self.CELL_SIZE//3, head_y + self.CELL_SIZE//3),
                          pupil_radius)
 
+    def setup_logical_board(self):
+        board_pixels = self.GRID_CELLS * LOGICAL_CELL_PIXELS
+        self.board = pygame.Surface((board_pixels, board_pixels))
+
+        # Scale straight into the screen area under the board, no extra blit
+        scaled_size = int(self.GRID_CELLS * self.CELL_SIZE)
+        self.board_rect = pygame.Rect(0, 0, scaled_size, scaled_size)
+        self.board_rect.center = (self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2)
+        self.board_target = self.screen.subsurface(self.board_rect)
+        self.hud_rects = None
+
+        # Grid lines drawn into the logical board would be upscaled to
+        # several pixels, so they are drawn at screen resolution like the
+        # native view's, once, onto a transparent overlay. Its right and
+        # bottom closing lines lie just past the board
+        self.grid_overlay = pygame.Surface((scaled_size + 2, scaled_size + 2))
+        self.grid_overlay.set_colorkey(BLACK, pygame.RLEACCEL)
+        for i in range(self.GRID_CELLS + 1):
+            offset = i * self.CELL_SIZE
+            pygame.draw.line(self.grid_overlay, GRID_COLOR,
+                             (offset, 0), (offset, scaled_size), 2)
+            pygame.draw.line(self.grid_overlay, GRID_COLOR,
+                             (0, offset), (scaled_size, offset), 2)
+        # Screen strips outside the board the closing lines cover
+        self.grid_edges = [
+            pygame.Rect(self.board_rect.right, self.board_rect.top, 2, scaled_size + 2),
+            pygame.Rect(self.board_rect.left, self.board_rect.bottom, scaled_size + 2, 2),
+        ]
+
+    def draw_board_logical(self):
+        px = LOGICAL_CELL_PIXELS
+        self.board.fill(BLACK)
+        self.board.fill(PURPLE, (self.fruit_pos[0] * px, self.fruit_pos[1] * px, px, px))
+
+        for snake in (self.player_snake, self.ai_snake):
+            for segment in snake.body:
+                self.board.fill(snake.color, (segment[0] * px, segment[1] * px, px, px))
+            if not self.quality.draws(EYES):
+                continue
+            # A single white pixel per eye is all a logical cell has room for
+            head_x = snake.body[0][0] * px
+            head_y = snake.body[0][1] * px
+            self.board.set_at((head_x + px // 4, head_y + px // 4), WHITE)
+            self.board.set_at((head_x + 3 * px // 4, head_y + px // 4), WHITE)
+
+        pygame.transform.scale(self.board, self.board_rect.size, self.board_target)
+        if self.quality.draws(GRID):
+            self.screen.blit(self.grid_overlay, self.board_rect)
+        else:
+            for rect in self.grid_edges:
+                self.screen.fill(BLACK, rect)
+
     def draw_game(self):
+        if self.render_mode == "logical":
+            # Only the HUD areas around the board need clearing
+            if self.hud_rects is None:
+                self.screen.fill(BLACK)
+            else:
+                for rect in self.hud_rects:
+                    self.screen.fill(BLACK, rect)
+            self.draw_board_logical()
+        else:
+            self.draw_board()
+        self.draw_hud()
+
+    def draw_board(self):
         self.screen.fill(BLACK)
         
         # Calculate grid position
@@ -188,17 +300,17 @@ class Game:
         self.grid_offset_y = (self.WINDOW_HEIGHT - self.GRID_SIZE) // 2
         
         # Draw grid
-        grid_color = (30, 30, 30)
-        for x in range(self.GRID_CELLS + 1):
-            pygame.draw.line(self.screen, grid_color,
-                           (self.grid_offset_x + x * self.CELL_SIZE, self.grid_offset_y),
-                           (self.grid_offset_x + x * self.CELL_SIZE, self.grid_offset_y + self.GRID_SIZE),
-                           2)
-        for y in range(self.GRID_CELLS + 1):
-            pygame.draw.line(self.screen, grid_color,
-                           (self.grid_offset_x, self.grid_offset_y + y * self.CELL_SIZE),
-                           (self.grid_offset_x + self.GRID_SIZE, self.grid_offset_y + y * self.CELL_SIZE),
-                           2)
+        if self.quality.draws(GRID):
+            for x in range(self.GRID_CELLS + 1):
+                pygame.draw.line(self.screen, GRID_COLOR,
+                               (self.grid_offset_x + x * self.CELL_SIZE, self.grid_offset_y),
+                               (self.grid_offset_x + x * self.CELL_SIZE, self.grid_offset_y + self.GRID_SIZE),
+                               2)
+            for y in range(self.GRID_CELLS + 1):
+                pygame.draw.line(self.screen, GRID_COLOR,
+                               (self.grid_offset_x, self.grid_offset_y + y * self.CELL_SIZE),
+                               (self.grid_offset_x + self.GRID_SIZE, self.grid_offset_y + y * self.CELL_SIZE),
+                               2)
         
         # Draw fruit
         fruit_x = self.grid_offset_x + self.fruit_pos[0] * self.CELL_SIZE
@@ -209,7 +321,8 @@ class Game:
         # Draw snakes
         self.draw_snake(self.player_snake)
         self.draw_snake(self.ai_snake)
-        
+
+    def draw_hud(self):
         # Draw UI
         score_text = f"You: {self.player_snake.score}  AI: {self.ai_snake.score}"
         score_surface = self.font.render(score_text, True, WHITE)
@@ -223,8 +336,19 @@ class Game:
                                           centerx=self.WINDOW_WIDTH//2)
         self.screen.blit(timer_surface, timer_rect)
 
+        hud_rects = [score_rect, timer_rect]
+        if self.show_debug:
+            debug_surface = self.font.render(self.inputs.latency_text(), True, YELLOW)
+            debug_rect = self.screen.blit(debug_surface, (20, 20))
+            quality_surface = self.font.render(self.quality.text(), True, YELLOW)
+            hud_rects += [debug_rect, self.screen.blit(quality_surface, (20, debug_rect.bottom))]
+        if self.render_mode == "logical":
+            self.hud_rects = hud_rects
+
     def draw_start_screen(self):
         self.screen.fill(BLACK)
+        # The board view must repaint the whole screen after this
+        self.hud_rects = None
         
         title_font = pygame.font.Font(None, int(self.WINDOW_HEIGHT * 0.1))
         time_val = pygame.time.get_ticks() / 1000
@@ -249,6 +373,12 @@ class Game:
         
         return button_rect
 
+    def start_game(self):
+        self.game_state = "PLAYING"
+        self.start_time = time.time()
+        # Frame times from an earlier game say nothing about this one
+        self.quality.reset()
+
     def run(self):
         running = True
         while running:
@@ -262,12 +392,10 @@ class Game:
                         touch_x = event.x * self.WINDOW_WIDTH
                         touch_y = event.y * self.WINDOW_HEIGHT
                         if play_button.collidepoint(touch_x, touch_y):
-                            self.game_state = "PLAYING"
-                            self.start_time = time.time()
+                            self.start_game()
                     elif event.type == pygame.MOUSEBUTTONUP:  # Fallback for testing
                         if play_button.collidepoint(event.pos):
-                            self.game_state = "PLAYING"
-                            self.start_time = time.time()
+                            self.start_game()
             
             elif self.game_state == "PLAYING":
                 current_time = time.time()
@@ -277,28 +405,22 @@ class Game:
                     self.game_state = "GAME_OVER"
                     continue
                 
+                # Only game frames count towards the render quality
+                self.quality.start_frame()
                 for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                    elif event.type in (pygame.FINGERDOWN, pygame.FINGERUP):
-                        self.handle_touch_events(event)
-                    # Fallback keyboard controls for testing
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_LEFT and self.player_snake.direction != Direction.RIGHT:
-                            self.player_snake.direction = Direction.LEFT
-                        elif event.key == pygame.K_RIGHT and self.player_snake.direction != Direction.LEFT:
-                            self.player_snake.direction = Direction.RIGHT
-                        elif event.key == pygame.K_UP and self.player_snake.direction != Direction.DOWN:
-                            self.player_snake.direction = Direction.UP
-                        elif event.key == pygame.K_DOWN and self.player_snake.direction != Direction.UP:
-                            self.player_snake.direction = Direction.DOWN
+                    running = self.handle_play_event(event) and running
                 
+                self.inputs.apply(self.player_snake)
                 if self.player_snake.move(self.fruit_pos, self.ai_snake):
                     self.player_snake.score += 1
                     eating_sound.play()
                     self.place_fruit()
                 
-                if self.ai_snake.ai_move(self.fruit_pos, self.player_snake):
+                if self.ai_policy == "hamiltonian":
+                    ai_ate = self.ai_snake.solver_move(self.fruit_pos, self.player_snake)
+                else:
+                    ai_ate = self.ai_snake.ai_move(self.fruit_pos, self.player_snake)
+                if ai_ate:
                     self.ai_snake.score += 1
                     eating_sound.play()
                     self.place_fruit()
@@ -306,10 +428,21 @@ class Game:
                 self.draw_game()
             
             pygame.display.flip()
-            self.clock.tick(30)  # Increased FPS for smoother motion
+            self.quality.end_frame()
+            self.inputs.presented()
+            if self.game_state == "PLAYING":
+                # Reading events only once per frame would start a swipe's
+                # latency clock up to a frame late
+                running = self.pacer.wait(wait_event, self.handle_play_event) and running
+            else:
+                self.clock.tick(FPS)  # Increased FPS for smoother motion
 
+        if self.inputs.latency_report():
+            print(self.inputs.latency_text())
         pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    game = Game(ai_policy=args[0] if args else "heuristic",
+                render_mode="logical" if "--logical" in sys.argv else "native")
     game.run()
\ No newline at end of file
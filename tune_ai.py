@@ -0,0 +1,144 @@
+"""Population-based tuning of the heuristic AI in trial.py.
+
+Treats trial.AI_WEIGHTS as a parameter vector and searches it with a simple
+evolution strategy: each generation samples candidates around the current
+mean, plays them as the AI snake against the default weights in headless
+matches spread over a process pool, and moves the mean towards the best
+ones. Matches are played in rounds and candidates that are clearly behind
+after a round are dropped, so most of the time goes to promising ones.
+
+The best profile is written to trial.AI_PROFILE_PATH, which the interactive
+trial.py and snake_curses.py load for their AI snake. The headless tools
+keep to the default weights unless given a profile with --ai-profile, so
+their seeded matches always replay the same.
+
+    python tune_ai.py --generations 20 --population 16
+"""
+import headless  # matches are played headless, so before pygame
+
+import argparse
+import json
+from multiprocessing import Pool
+
+import numpy as np
+
+import trial
+
+# name, low, high, integer
+PARAMS = [
+    ("fruit_weight", 0.0, 10.0, False),
+    ("other_snake_weight", 0.0, 10.0, False),
+    ("memory_penalty", 0.0, 20.0, False),
+    ("memory_size", 10, 100, True),
+    ("stuck_window", 5, 50, True),
+    ("stuck_unique", 2, 20, True),
+    ("stuck_limit", 1, 20, True),
+    ("trap_penalty", 0.0, 200.0, False),
+]
+LOW = np.array([p[1] for p in PARAMS], float)
+HIGH = np.array([p[2] for p in PARAMS], float)
+
+
+def to_weights(vector):
+    """Map a vector in [0, 1]^n to an AI weights dict."""
+    values = LOW + np.clip(vector, 0, 1) * (HIGH - LOW)
+    return {name: int(round(v)) if integer else float(v)
+            for (name, _, _, integer), v in zip(PARAMS, values)}
+
+
+def to_vector(weights):
+    values = np.array([weights[name] for name, *_ in PARAMS], float)
+    return (values - LOW) / (HIGH - LOW)
+
+
+def play_match(task):
+    """Score difference of `weights` as the AI snake against the defaults."""
+    weights, seed, ticks = task
+    for game in headless.play(seed, ticks, player_policy="heuristic",
+                              ai_weights=weights, player_weights=trial.AI_WEIGHTS):
+        pass
+    return game.ai_snake.score - game.player_snake.score
+
+
+def evaluate(pool, candidates, seeds, rounds, margin, ticks):
+    """Play every candidate on the same seeds, dropping clear losers early.
+
+    Returns the mean score difference of each candidate over all matches,
+    or -inf for candidates dropped before the last round: a mean over fewer
+    matches is noisier and can't be ranked against the others.
+    """
+    results = [[] for _ in candidates]
+    alive = list(range(len(candidates)))
+    for batch in np.array_split(np.asarray(seeds), rounds):
+        tasks = [(candidates[i], int(seed), ticks) for i in alive for seed in batch]
+        scores = pool.map(play_match, tasks)
+        for n, i in enumerate(alive):
+            results[i].extend(scores[n * len(batch):(n + 1) * len(batch)])
+
+        best = max(np.mean(results[i]) for i in alive)
+        alive = [i for i in alive if np.mean(results[i]) >= best - margin]
+    return [float(np.mean(results[i])) if i in alive else -np.inf
+            for i in range(len(candidates))]
+
+
+def tune(generations=20, population=16, elite=4, matches=24, rounds=3, margin=3.0,
+         sigma=0.2, ticks=trial.MATCH_TICKS, processes=None, seed=0):
+    rng = np.random.default_rng(seed)
+    mean = to_vector(trial.AI_WEIGHTS)
+    best_weights, best_fitness = dict(trial.AI_WEIGHTS), None
+    # Elite weights for recombination, the best gets the most say
+    ranks = np.log(elite + 0.5) - np.log(np.arange(1, elite + 1))
+
+    pool = Pool(processes)
+    try:
+        for generation in range(generations):
+            vectors = np.clip(mean + sigma * rng.standard_normal((population, len(PARAMS))), 0, 1)
+            vectors[0] = mean  # keep the current mean in the race
+            candidates = [to_weights(v) for v in vectors]
+
+            # Same seeds for every candidate so they are compared fairly
+            seeds = rng.integers(0, 2**31, matches)
+            fitness = evaluate(pool, candidates, seeds, rounds, margin, ticks)
+
+            order = np.argsort(fitness)[::-1]
+            # Fewer than `elite` may have played every round
+            top = [i for i in order[:elite] if np.isfinite(fitness[i])]
+            mean = ranks[:len(top)] @ vectors[top] / ranks[:len(top)].sum()
+            sigma *= 0.95
+            if best_fitness is None or fitness[order[0]] > best_fitness:
+                best_weights, best_fitness = candidates[order[0]], fitness[order[0]]
+            print(f"generation {generation}: best {fitness[order[0]]:+.2f}"
+                  f"  overall {best_fitness:+.2f}  sigma {sigma:.3f}")
+    finally:
+        pool.close()
+        pool.join()
+
+    return best_weights, best_fitness
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune trial.py's heuristic AI weights")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--elite", type=int, default=4)
+    parser.add_argument("--matches", type=int, default=24, help="matches per candidate")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="rounds the matches are split into for early stopping")
+    parser.add_argument("--margin", type=float, default=3.0,
+                        help="drop candidates this far behind the round's best")
+    parser.add_argument("--ticks", type=int, default=trial.MATCH_TICKS)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=trial.AI_PROFILE_PATH)
+    args = parser.parse_args()
+
+    weights, fitness = tune(args.generations, args.population, args.elite, args.matches,
+                            args.rounds, args.margin, ticks=args.ticks,
+                            processes=args.processes, seed=args.seed)
+    with open(args.out, "w") as f:
+        json.dump(weights, f, indent=4)
+    print(f"Best profile ({fitness:+.2f} per match vs defaults) written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()